@@ -0,0 +1,8 @@
+"""Streaming course catalog parser used by data2csv.py."""
+
+from catalog.parser import iter_lines, parse_records, parse_tokens, tokenize
+from catalog.record import FIELDS, HEADERS, CourseRecord
+from catalog.writers import write_csv
+
+__all__ = ['FIELDS', 'HEADERS', 'CourseRecord', 'iter_lines', 'parse_records',
+           'parse_tokens', 'tokenize', 'write_csv']
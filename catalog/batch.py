@@ -0,0 +1,91 @@
+"""Concurrent ingestion of a directory of per-department catalog files.
+
+Files are read and parsed in threads, at most ``concurrency`` at a time.
+Parsed files reach a single writer through a bounded queue in their original
+order, so a slow output disk stalls the readers instead of letting parsed
+records pile up in memory.
+"""
+
+import asyncio
+import glob
+import os
+import time
+from collections import namedtuple
+
+from catalog.parser import iter_lines, parse_records
+
+FileStats = namedtuple('FileStats', ['path', 'records', 'seconds'])
+
+
+def expand_batch(target):
+    """Catalog files for a directory (its ``*.txt`` files) or a glob, sorted."""
+    if os.path.isdir(target):
+        target = os.path.join(target, '*.txt')
+    return sorted(path for path in glob.glob(target) if os.path.isfile(path))
+
+
+def _parse_lines(path, textbooks=False):
+    return parse_records(iter_lines([path]), textbooks)
+
+
+def _parse_file(path, code_prefix, cache, textbooks):
+    """Parse one file on a worker thread; return its records and parse time."""
+    start = time.perf_counter()
+    if cache is not None:
+        records = cache.records(path, _parse_lines, textbooks)
+    else:
+        records = _parse_lines(path, textbooks)
+    records = [record for record in records if record.course_code.startswith(code_prefix)]
+    return records, time.perf_counter() - start
+
+
+async def ingest(paths, sink, concurrency=8, queue_size=16, code_prefix='',
+                 cache=None, select=None, textbooks=False):
+    """Write every file in ``paths`` to ``sink`` (e.g. a ``CsvSink``) in order.
+
+    With a ``ParseCache``, unchanged files are loaded from it instead of parsed.
+    ``select``, if given, maps each file's records to the ones to write.
+    ``textbooks`` keeps each record's Textbook text.
+
+    Returns the number of rows written and a ``FileStats`` per file.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, not {concurrency}")
+    semaphore = asyncio.Semaphore(concurrency)
+    queue = asyncio.Queue(maxsize=queue_size)
+
+    async def parse(path):
+        async with semaphore:
+            return await asyncio.to_thread(_parse_file, path, code_prefix, cache, textbooks)
+
+    async def produce():
+        for path in paths:
+            # Waits here while the writer is queue_size files behind
+            await queue.put((path, asyncio.create_task(parse(path))))
+        await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+
+    count = 0
+    stats = []
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            path, task = item
+            records, seconds = await task
+            if select is not None:
+                records = select(records)
+            written = await asyncio.to_thread(sink.write, records)
+            count += written
+            stats.append(FileStats(path, written, seconds))
+        await producer
+    finally:
+        # On error, stop reading and drop parses nobody will write
+        producer.cancel()
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None:
+                item[1].cancel()
+    return count, stats
@@ -0,0 +1,6 @@
+"""Benchmarks for the catalog parser.
+
+``python -m catalog.bench`` runs the micro-benchmarks in ``micro`` against the
+bundled catalog. ``synth`` generates seeded synthetic catalogs of any size and
+``runner`` times each pipeline stage on them and saves the results as JSON.
+"""
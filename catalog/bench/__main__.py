@@ -0,0 +1,3 @@
+from catalog.bench.micro import main
+
+raise SystemExit(main())
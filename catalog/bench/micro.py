@@ -0,0 +1,183 @@
+"""Micro-benchmarks against the bundled catalog.
+
+    python -m catalog.bench [--scale 1000] [--repeat 3]
+    python -m catalog.bench --stress
+    python -m catalog.bench --memory [--scale 100]
+    python -m catalog.bench --parallel [--scale 20000]
+
+Replicates the bundled ``raw_data`` catalog ``--scale`` times and reports
+lines/sec for the original startswith/replace/re.sub chain and for the
+current ``parse_records``. ``--stress`` instead parses single courses whose
+Content runs over 10k+ continuation lines and reports how time scales.
+``--memory`` keeps every parsed record alive and reports bytes per record
+as measured by tracemalloc. ``--parallel`` writes the scaled catalog to a
+temporary file and times ``parse_parallel`` with 1/2/4/8 worker processes
+(``--scale 20000`` is about 2.3M records).
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+
+from catalog.parallel import parse_parallel
+from catalog.parser import parse_records
+from catalog.scanner import scan_file
+
+
+def legacy_parse(lines):
+    """The original data2csv.py loop, kept only as a benchmark baseline."""
+    current_course = {}
+    reading_content = False
+    for line in lines:
+        clean_line = line.strip()
+        if not clean_line:
+            continue
+        if clean_line.startswith("Course Code:"):
+            if current_course:
+                yield current_course
+            current_course = {
+                'Course Code': clean_line.replace("Course Code:", "").strip(),
+                'Course Title': '',
+                'Credit Hour': '',
+                'Prerequisite': '',
+                'Content': ''
+            }
+            reading_content = False
+        elif clean_line.startswith("Course Title:"):
+            current_course['Course Title'] = clean_line.replace("Course Title:", "").strip()
+            reading_content = False
+        elif clean_line.startswith("Credit Hour:"):
+            current_course['Credit Hour'] = clean_line.replace("Credit Hour:", "").strip()
+            reading_content = False
+        elif clean_line.startswith("Prerequisite:"):
+            current_course['Prerequisite'] = clean_line.replace("Prerequisite:", "").strip()
+            reading_content = False
+        elif clean_line.startswith("Content:") or clean_line.startswith("Contents:"):
+            current_course['Content'] = re.sub(r"Contents?:", "", clean_line).strip()
+            reading_content = True
+        elif clean_line.startswith("Textbook:"):
+            reading_content = False
+        elif reading_content:
+            current_course['Content'] += " " + clean_line
+    if current_course:
+        yield current_course
+
+
+def sample_lines(scale):
+    """The bundled catalog's lines repeated ``scale`` times."""
+    from data2csv import raw_data
+    return raw_data.splitlines(keepends=True) * scale
+
+
+def stress_lines(continuations):
+    """One course whose Content spans ``continuations`` extra lines."""
+    lines = ["Course Code: CSE9999\n", "Content: Stress syllabus.\n"]
+    lines.extend(f"Topic {i}: fundamental concepts, data types and control structures.\n"
+                 for i in range(continuations))
+    lines.append("Textbook: As per instructor's guideline\n")
+    return lines
+
+
+def time_parser(parse, lines, repeat):
+    """Best wall-clock time over ``repeat`` full passes of ``parse``."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in parse(lines):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_stress(repeat, sizes=(10_000, 20_000, 40_000, 80_000, 160_000)):
+    """Print time per continuation line; flat means linear scaling."""
+    # The legacy += loop is quadratic, so it is only run on the smaller sizes
+    legacy_limit = 20_000
+    for size in sizes:
+        lines = stress_lines(size)
+        row = f"{size:>8,} lines"
+        for name, parse in (('legacy', legacy_parse), ('current', parse_records)):
+            if parse is legacy_parse and size > legacy_limit:
+                continue
+            seconds = time_parser(parse, lines, repeat)
+            row += f"  {name}: {seconds:8.3f}s ({seconds / size * 1e9:8.0f} ns/line)"
+        print(row)
+    return 0
+
+
+def record_bytes(parse, lines):
+    """Average traced bytes held per record when all of them are kept."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        records = list(parse(lines))
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return len(records), (after - before) / len(records)
+
+
+def run_memory(scale):
+    """Print bytes per record for legacy dicts and ``CourseRecord`` slots."""
+    lines = sample_lines(scale)
+    for name, parse in (('legacy', legacy_parse), ('current', parse_records)):
+        count, per_record = record_bytes(parse, lines)
+        print(f"{name:>8}: {per_record:>8,.0f} bytes/record ({count:,} records)")
+    return 0
+
+
+def run_parallel(scale, worker_counts=(1, 2, 4, 8)):
+    """Print records/sec for the mmap scanner and each process-pool size."""
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8',
+                                     delete=False) as handle:
+        handle.writelines(sample_lines(scale))
+    try:
+        size_mb = os.path.getsize(handle.name) / 1e6
+        print(f"{size_mb:,.0f} MB ({scale}x bundled catalog), {os.cpu_count()} CPUs")
+        runs = [('mmap', lambda: scan_file(handle.name))]
+        runs += [(f"{n} workers", lambda n=n: parse_parallel([handle.name], n))
+                 for n in worker_counts]
+        for name, parse in runs:
+            start = time.perf_counter()
+            count = sum(1 for _ in parse())
+            seconds = time.perf_counter() - start
+            print(f"{name:>10}: {count / seconds:>10,.0f} records/sec ({seconds:.2f}s)")
+    finally:
+        os.unlink(handle.name)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1000,
+                        help="Copies of the bundled catalog to parse. Default: 1000")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Passes per parser; the fastest is reported. Default: 3")
+    parser.add_argument('--stress', action='store_true',
+                        help="Time one course with 10k-160k Content continuation lines")
+    parser.add_argument('--memory', action='store_true',
+                        help="Report tracemalloc bytes per retained record")
+    parser.add_argument('--parallel', action='store_true',
+                        help="Time parse_parallel at 1/2/4/8 worker processes")
+    args = parser.parse_args(argv)
+
+    if args.stress:
+        return run_stress(args.repeat)
+    if args.memory:
+        return run_memory(args.scale)
+    if args.parallel:
+        return run_parallel(args.scale)
+
+    lines = sample_lines(args.scale)
+    print(f"{len(lines):,} lines ({args.scale}x bundled catalog)")
+    for name, parse in (('legacy', legacy_parse), ('current', parse_records)):
+        seconds = time_parser(parse, lines, args.repeat)
+        print(f"{name:>8}: {len(lines) / seconds:>12,.0f} lines/sec ({seconds:.2f}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
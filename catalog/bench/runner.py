@@ -0,0 +1,220 @@
+"""Per-stage throughput suite on synthetic catalogs.
+
+    python -m catalog.bench.runner --courses 1e3 1e5 1e6 --json results.json
+    python -m catalog.bench.runner --courses 1e5 --baseline results.json
+
+For each size a seeded catalog is written to a temporary file, then every
+stage runs in a fresh process so its peak RSS is its own: ``read`` (line
+iteration only), ``tokenize``, ``parse`` (records, nothing written), ``mmap``
+(the byte scanner), ``write`` (parse plus CSV output, with the time spent
+inside the writer reported separately) and ``sqlite`` (parse plus a SQLite
+load, with the time spent loading, indexing and building the FTS table
+reported the same way). Results can be saved as JSON and
+compared against an earlier run with ``--baseline``.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import get_context
+
+from catalog.bench.synth import write_catalog
+from catalog.parser import iter_lines, parse_records, tokenize
+from catalog.record import HEADERS
+from catalog.scanner import scan_file
+from catalog.sqlite import SqliteSink
+from catalog.writers import write_rows
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ['read', 'tokenize', 'parse', 'mmap', 'write', 'sqlite']
+
+# Records handed to the CSV writer at a time in the write stage
+WRITE_BATCH = 10_000
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _consume(iterable):
+    count = 0
+    for _ in iterable:
+        count += 1
+    return count
+
+
+def _write_stage(path):
+    """Parse and write ``path``; return (records, seconds inside the writer)."""
+    records = parse_records(iter_lines([path]))
+    write_seconds = 0.0
+    count = 0
+    with tempfile.TemporaryFile('w+', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out)
+        writer.writerow(HEADERS)
+        while True:
+            batch = list(islice(records, WRITE_BATCH))
+            if not batch:
+                break
+            start = time.perf_counter()
+            count += write_rows(writer, batch)
+            write_seconds += time.perf_counter() - start
+    return count, write_seconds
+
+
+def _sqlite_stage(path):
+    """Parse ``path`` into a temporary database; return (records, seconds in the sink)."""
+    records = parse_records(iter_lines([path]))
+    load_seconds = 0.0
+    count = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        sink = SqliteSink(os.path.join(tmp, 'courses.db'))
+        load_seconds += time.perf_counter() - start
+        while True:
+            batch = list(islice(records, WRITE_BATCH))
+            if not batch:
+                break
+            start = time.perf_counter()
+            count += sink.write(batch)
+            load_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        sink.close()
+        load_seconds += time.perf_counter() - start
+    return count, load_seconds
+
+
+def run_stage(stage, path):
+    """Run one stage in the current process and return its measurements."""
+    start = time.perf_counter()
+    write_seconds = None
+    if stage == 'read':
+        items = _consume(iter_lines([path]))
+    elif stage == 'tokenize':
+        items = _consume(tokenize(iter_lines([path])))
+    elif stage == 'parse':
+        items = _consume(parse_records(iter_lines([path])))
+    elif stage == 'mmap':
+        items = _consume(scan_file(path))
+    elif stage == 'write':
+        items, write_seconds = _write_stage(path)
+    elif stage == 'sqlite':
+        items, write_seconds = _sqlite_stage(path)
+    else:
+        raise ValueError(f"unknown stage {stage!r}")
+    seconds = time.perf_counter() - start
+
+    result = {'seconds': seconds, 'items': items, 'peak_rss_bytes': peak_rss_bytes()}
+    if write_seconds is not None:
+        result['write_seconds'] = write_seconds
+    return result
+
+
+def run_size(courses, seed, stages):
+    """Generate one catalog and measure each stage in its own process."""
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8',
+                                     delete=False) as handle:
+        start = time.perf_counter()
+        lines = write_catalog(handle, courses, seed)
+        generate_seconds = time.perf_counter() - start
+    try:
+        size = os.path.getsize(handle.name)
+        results = {}
+        for stage in stages:
+            # A fresh interpreter per stage keeps peak RSS from leaking across
+            with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as pool:
+                result = pool.submit(run_stage, stage, handle.name).result()
+            result['lines_per_sec'] = lines / result['seconds']
+            result['mb_per_sec'] = size / 1e6 / result['seconds']
+            results[stage] = result
+    finally:
+        os.unlink(handle.name)
+    return {
+        'courses': courses,
+        'seed': seed,
+        'lines': lines,
+        'bytes': size,
+        'generate_seconds': generate_seconds,
+        'stages': results,
+    }
+
+
+def print_size(run, baseline=None):
+    print(f"{run['courses']:,} courses: {run['lines']:,} lines, "
+          f"{run['bytes'] / 1e6:,.1f} MB")
+    for stage, result in run['stages'].items():
+        rss = result['peak_rss_bytes']
+        line = (f"  {stage:>8}: {result['seconds']:8.3f}s "
+                f"{result['lines_per_sec']:>12,.0f} lines/s "
+                f"{result['mb_per_sec']:>8,.1f} MB/s "
+                f"peak {rss / 1e6 if rss else float('nan'):>7,.1f} MB")
+        if 'write_seconds' in result:
+            line += (f"  (writer {result['write_seconds']:.3f}s, "
+                     f"{result['items'] / result['write_seconds']:,.0f} rows/s)")
+        old = (baseline or {}).get(stage)
+        if old:
+            line += f"  {result['lines_per_sec'] / old['lines_per_sec']:5.2f}x baseline"
+        print(line)
+
+
+def _baseline_stages(path):
+    """Stage results per course count from an earlier ``--json`` file."""
+    with open(path, encoding='utf-8') as handle:
+        report = json.load(handle)
+    return {run['courses']: run['stages'] for run in report['runs']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time each catalog pipeline stage.")
+    parser.add_argument('--courses', nargs='+', type=lambda value: int(float(value)),
+                        default=[1000, 10_000, 100_000],
+                        help="Catalog sizes to run, e.g. 1e3 1e5 1e7. "
+                             "Default: 1e3 1e4 1e5")
+    parser.add_argument('--seed', type=int, default=0, help="Generator seed. Default: 0")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help="Stages to run. Default: all")
+    parser.add_argument('--label', default='',
+                        help="Name for this run in the JSON, e.g. a git revision")
+    parser.add_argument('--json', metavar='PATH', help="Write the results to PATH")
+    parser.add_argument('--baseline', metavar='PATH',
+                        help="Compare lines/sec with an earlier --json file")
+    args = parser.parse_args(argv)
+
+    baseline = _baseline_stages(args.baseline) if args.baseline else {}
+    runs = []
+    for courses in args.courses:
+        run = run_size(courses, args.seed, args.stages)
+        print_size(run, baseline.get(courses))
+        runs.append(run)
+
+    if args.json:
+        report = {
+            'label': args.label,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'runs': runs,
+        }
+        with open(args.json, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
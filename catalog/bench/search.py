@@ -0,0 +1,82 @@
+"""Query latency for the full-text search index.
+
+    python -m catalog.bench.search [--courses 100000] [--repeat 20]
+
+Builds an index over a seeded synthetic catalog (see ``synth``), then times
+opening it and each kind of query: single terms, multi-term OR queries,
+phrases and prefixes. The synthetic vocabulary is small, so nearly every
+term appears in most courses; that makes these worst-case posting lengths
+rather than typical ones.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from catalog.bench.synth import generate_catalog
+from catalog.parser import parse_records
+from catalog.search import SearchIndex, SearchIndexBuilder
+
+QUERIES = {
+    'term': ['scheduling', 'probability', 'circuits'],
+    'or': ['graphs sorting', 'memory processes scheduling'],
+    'phrase': ['"data types"', '"sorting and searching"'],
+    'prefix': ['sched*', 'pro*', 'dist*'],
+    'rare': ['bioinformatics', '"machine learning lab"'],
+}
+
+
+def _ms(seconds):
+    return seconds * 1000
+
+
+def run(courses, seed, repeat):
+    builder = SearchIndexBuilder()
+    start = time.perf_counter()
+    for record in parse_records(generate_catalog(courses, seed)):
+        builder.add(record)
+    parse_build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'search.idx')
+        start = time.perf_counter()
+        documents, terms = builder.save(path)
+        save = time.perf_counter() - start
+        del builder
+        print(f"{documents:,} courses, {terms:,} terms, "
+              f"{os.path.getsize(path) / 1e6:,.1f} MB index; "
+              f"parse+tokenize {parse_build:.2f}s, save {save:.2f}s")
+
+        start = time.perf_counter()
+        index = SearchIndex.open(path)
+        print(f"  open: {_ms(time.perf_counter() - start):.3f} ms")
+        with index:
+            for kind, queries in QUERIES.items():
+                timings = []
+                for _ in range(repeat):
+                    for query in queries:
+                        start = time.perf_counter()
+                        index.search(query)
+                        timings.append(time.perf_counter() - start)
+                timings.sort()
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                print(f"  {kind:>6}: p50 {_ms(statistics.median(timings)):8.2f} ms  "
+                      f"p95 {_ms(p95):8.2f} ms  max {_ms(timings[-1]):8.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time search index queries.")
+    parser.add_argument('--courses', type=lambda value: int(float(value)), default=100_000,
+                        help="Synthetic catalog size. Default: 1e5")
+    parser.add_argument('--seed', type=int, default=0, help="Generator seed. Default: 0")
+    parser.add_argument('--repeat', type=int, default=20,
+                        help="Times each query is run. Default: 20")
+    args = parser.parse_args(argv)
+    run(args.courses, args.seed, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+"""Seeded synthetic course catalogs.
+
+    python -m catalog.bench.synth --courses 100000 [--seed 0] -o synthetic.txt
+
+The output follows the shape of the pasted ULAB syllabi: both ``Content:``
+and ``Contents:`` labels, content spread over several lines, numbered
+Textbook lists, multi-value Prerequisite lines such as ``CSE2103 & CSE2104``,
+and stray blank or whitespace-only lines. The same seed always produces the
+same catalog.
+"""
+
+import argparse
+import random
+import sys
+
+DEPARTMENTS = ['CSE', 'EEE', 'MAT', 'PHY', 'BBA', 'ENG', 'GED', 'ECO']
+
+CREDIT_HOURS = ['1.00', '3.00', '4.00']
+CREDIT_WEIGHTS = [2, 7, 1]
+
+TITLE_WORDS = [
+    'Introduction', 'Advanced', 'Applied', 'Digital', 'Systems', 'Design',
+    'Analysis', 'Theory', 'Networks', 'Programming', 'Logic', 'Structures',
+    'Algorithms', 'Signals', 'Management', 'Communication', 'Calculus',
+    'Statistics', 'Databases', 'Security', 'Machine Learning', 'Lab',
+]
+
+CONTENT_WORDS = [
+    'fundamental', 'concepts', 'of', 'procedural', 'programming', 'data',
+    'types', 'control', 'structures', 'functions', 'arrays', 'files',
+    'testing', 'debugging', 'graphs', 'trees', 'sorting', 'searching',
+    'complexity', 'memory', 'processes', 'scheduling', 'circuits', 'signals',
+    'transforms', 'matrices', 'vectors', 'probability', 'distributions',
+    'models', 'design', 'analysis', 'the', 'and', 'with', 'applications',
+]
+
+AUTHORS = [
+    'Herbert Schildt', 'Howard Anton', 'Gilbert Strang', 'Thomas H. Cormen',
+    'Abraham Silberschatz', 'Andrew S. Tanenbaum', 'M. Morris Mano',
+    'Sheldon Ross', 'Ron Larson', 'Richard L. Burden',
+]
+
+BOILERPLATE_TEXTBOOK = "As per instructor 's guideline"
+
+
+def _sentence(rng, low, high):
+    words = rng.choices(CONTENT_WORDS, k=rng.randint(low, high))
+    return ' '.join(words).capitalize() + '.'
+
+
+def _prerequisite(rng, codes):
+    """``N/A`` most of the time, otherwise one to three earlier codes."""
+    if not codes or rng.random() < 0.55:
+        return 'N/A'
+    picks = rng.sample(codes, min(len(codes), rng.choice([1, 1, 2, 3])))
+    return rng.choice([', ', ' & ', ' and ']).join(picks)
+
+
+def generate_catalog(courses, seed=0):
+    """Yield the lines (with newlines) of a catalog of ``courses`` courses."""
+    rng = random.Random(seed)
+    # Recent codes feed prerequisite lines so they look like real references
+    recent = []
+    for index in range(courses):
+        department = rng.choice(DEPARTMENTS)
+        level = rng.randint(1, 4)
+        # The index keeps codes unique however large the catalog gets
+        code = f"{department}{level}{index:03d}"
+        title = ' '.join(rng.sample(TITLE_WORDS, rng.randint(2, 4)))
+
+        yield f"Course Code: {code}\n"
+        yield f"Course Title: {title}\n"
+        yield f"Credit Hour: {rng.choices(CREDIT_HOURS, CREDIT_WEIGHTS)[0]}\n"
+        yield f"Prerequisite: {_prerequisite(rng, recent)}\n"
+        if rng.random() < 0.2:
+            yield "\n"
+
+        label = 'Contents' if rng.random() < 0.3 else 'Content'
+        yield f"{label}: {_sentence(rng, 20, 80)}\n"
+        for _ in range(rng.choice([0, 0, 0, 1, 2, 5])):
+            yield f"{_sentence(rng, 10, 40)}\n"
+            if rng.random() < 0.1:
+                yield " \n"
+
+        if rng.random() < 0.35:
+            yield f"Textbook: {BOILERPLATE_TEXTBOOK}\n"
+        else:
+            books = rng.randint(1, 3)
+            for number in range(1, books + 1):
+                prefix = "Textbook: " if number == 1 else ""
+                edition = rng.choice(['Latest Edition', '5th Edition', '10th Edition'])
+                yield (f"{prefix}{number}. {' '.join(rng.sample(TITLE_WORDS, 2))} "
+                       f"by {rng.choice(AUTHORS)}, {edition}\n")
+        yield rng.choice(["\n", " \n", "\n\n"])
+
+        recent.append(code)
+        if len(recent) > 50:
+            recent.pop(0)
+
+
+def write_catalog(handle, courses, seed=0):
+    """Write a synthetic catalog to ``handle``; return the line count."""
+    lines = 0
+    for line in generate_catalog(courses, seed):
+        handle.write(line)
+        lines += line.count('\n')
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic course catalog.")
+    parser.add_argument('--courses', type=lambda value: int(float(value)), default=1000,
+                        help="Number of courses, e.g. 1e6. Default: 1000")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed. Default: 0")
+    parser.add_argument('-o', '--output', default='-',
+                        help="Output path ('-' writes to stdout). Default: -")
+    args = parser.parse_args(argv)
+
+    if args.output == '-':
+        write_catalog(sys.stdout, args.courses, args.seed)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            write_catalog(handle, args.courses, args.seed)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+"""Typeahead latency: trigram index against the linear filter.
+
+    python -m catalog.bench.typeahead [--courses 1e3 1e4 1e5] [--repeat 20]
+
+For each size, the (code, title) pairs of a seeded synthetic catalog are
+loaded into a ``TypeaheadIndex``. Each query is then typed one character at
+a time, and every keystroke is answered both by the index and by
+``linear_filter``, the component's current behaviour. The script checks
+that the two results are identical and reports the mean time per keystroke,
+split into one- and two-character prefixes (which the index also answers
+with a scan) and longer ones.
+"""
+
+import argparse
+import time
+
+from catalog.bench.synth import generate_catalog
+from catalog.parser import parse_records
+from catalog.typeahead import TypeaheadBuilder, linear_filter
+
+QUERIES = ['cse2', 'introduction', 'machine learning', 'eee3101', 'data str', 'zzz']
+
+
+def _keystrokes():
+    return [query[:end] for query in QUERIES for end in range(1, len(query) + 1)]
+
+
+def _time(search, keystrokes, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in keystrokes:
+            search(text)
+    return (time.perf_counter() - start) / (repeat * len(keystrokes))
+
+
+def run(courses, seed, repeat):
+    builder = TypeaheadBuilder()
+    for record in parse_records(generate_catalog(courses, seed)):
+        builder.add(record)
+    start = time.perf_counter()
+    index = builder.build()
+    build = time.perf_counter() - start
+
+    keystrokes = _keystrokes()
+    for text in keystrokes:
+        if index.search(text) != linear_filter(index.courses, text):
+            raise AssertionError(f"index and linear filter disagree on {text!r}")
+    print(f"{len(index.courses):>9,} courses: build {build:.2f}s")
+    for label, group in (('1-2 chars', [text for text in keystrokes if len(text) < 3]),
+                         ('3+ chars', [text for text in keystrokes if len(text) >= 3])):
+        indexed = _time(index.search, group, repeat)
+        linear = _time(lambda text: linear_filter(index.courses, text), group, repeat)
+        print(f"  {label:>9}: index {indexed * 1e3:8.3f} ms/key  "
+              f"linear {linear * 1e3:8.3f} ms/key  {linear / indexed:6.1f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time typeahead matching.")
+    parser.add_argument('--courses', nargs='+', type=lambda value: int(float(value)),
+                        default=[1000, 10_000, 100_000],
+                        help="Synthetic catalog sizes. Default: 1e3 1e4 1e5")
+    parser.add_argument('--seed', type=int, default=0, help="Generator seed. Default: 0")
+    parser.add_argument('--repeat', type=int, default=20,
+                        help="Times each keystroke sequence is replayed. Default: 20")
+    args = parser.parse_args(argv)
+    for courses in args.courses:
+        run(courses, args.seed, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+"""On-disk parse cache keyed by the hash of each input file.
+
+Entries hold a file's unfiltered rows as JSON, named after the SHA-256 of the
+file's bytes, so an unchanged file is never tokenized twice no matter where
+it lives or what it is called. Runs that keep Textbook text use separate
+entries whose rows end with it. Hits refresh an entry's mtime, and ``prune``
+evicts the least recently used entries beyond the size budget as well as
+anything older than the age limit.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog.parallel import parse_parallel
+from catalog.record import record_class, record_row
+from catalog.scanner import scan_file, scan_records
+
+# Bump when parser output changes so stale entries stop matching
+CACHE_VERSION = b'catalog-cache-3'
+
+BLOCK_SIZE = 1024 * 1024
+
+
+def file_key(path, textbooks=False):
+    """Hex SHA-256 of ``path``'s bytes, salted with ``CACHE_VERSION``."""
+    digest = hashlib.sha256(CACHE_VERSION + (b'+textbooks' if textbooks else b''))
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Parsed records per input file under ``directory``."""
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, max_age=180 * 86400):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def records(self, path, parse, textbooks=False):
+        """Records for ``path``, from the cache or from ``parse(path, textbooks=...)``."""
+        entry = self._entry(file_key(path, textbooks))
+        try:
+            with open(entry, encoding='utf-8') as handle:
+                rows = json.load(handle)
+        except (OSError, ValueError):
+            # Missing or unreadable entry: parse and (re)write it
+            self.misses += 1
+            records = list(parse(path, textbooks=textbooks))
+            self._store(entry, [record_row(record) for record in records])
+            return records
+
+        self.hits += 1
+        # Hits count as a use for LRU eviction
+        os.utime(entry)
+        make_record = record_class(textbooks)
+        return [make_record(*row) for row in rows]
+
+    def _store(self, entry, rows):
+        """Write ``rows`` to ``entry`` atomically so readers never see half a file."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+                json.dump(rows, handle, separators=(',', ':'))
+            os.replace(tmp, entry)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def prune(self):
+        """Evict entries past ``max_age``, then LRU entries beyond ``max_bytes``.
+
+        Returns the number of entries removed.
+        """
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for item in scan:
+                if item.name.endswith('.json'):
+                    stat = item.stat()
+                    entries.append((stat.st_mtime, stat.st_size, item.path))
+
+        cutoff = time.time() - self.max_age
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        # Oldest first: expired entries, then whatever still exceeds the budget
+        for mtime, size, path in sorted(entries):
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+
+def scan_cached(paths, cache, code_prefix='', textbooks=False, workers=1):
+    """Like ``scan_records``, but each file's records come through ``cache``.
+
+    With ``workers`` above 1, files missing from the cache are parsed by
+    that many processes, as ``parse_parallel`` does.
+    """
+    if workers > 1:
+        # Processes only start once a miss submits work
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            def parse(path, textbooks):
+                return parse_parallel([path], workers, textbooks=textbooks, pool=pool)
+            yield from _scan_cached(paths, cache, code_prefix, textbooks, parse)
+        return
+    yield from _scan_cached(paths, cache, code_prefix, textbooks, scan_file)
+
+
+def _scan_cached(paths, cache, code_prefix, textbooks, parse):
+    for path in paths:
+        if path == '-':
+            yield from scan_records(['-'], code_prefix, textbooks)
+            continue
+        for record in cache.records(path, parse, textbooks):
+            if record.course_code.startswith(code_prefix):
+                yield record
@@ -0,0 +1,275 @@
+"""Columnar catalog output with dictionary encoding.
+
+Credit Hour takes only a few distinct values and Prerequisite is mostly
+``N/A``, yet CSV repeats every value in full on every row. The columnar
+output stores each column separately, so reading one column (all the course
+codes, say) touches only that column's bytes.
+
+With pyarrow installed the output is Parquet. Titles, credit hours and
+prerequisites are dictionary-encoded there. Without pyarrow it is this
+module's own layout::
+
+    b'CATCOLS1'
+    column segments, one after another
+    directory (UTF-8 JSON)
+    directory length (uint64 LE), b'CATCOLS1'
+
+The directory records the row count and, for each column, its encoding and
+the ``[offset, length]`` of its segments:
+
+* ``dictionary``: the distinct values, inline in the directory, and a
+  ``codes`` segment with one uint8/uint16/uint32 index per row.
+* ``plain``: an ``offsets`` segment of rows + 1 uint32/uint64 byte offsets
+  and a ``blob`` segment of the concatenated UTF-8 values.
+
+Every column starts out dictionary-encoded. It switches to plain once it
+has more than ``MAX_DICTIONARY`` distinct values, or more distinct values
+than half its rows. Content and Course Code almost always end up plain.
+"""
+
+import importlib.util
+import json
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+from catalog.record import HEADERS
+
+MAGIC = b'CATCOLS1'
+_TRAILER = struct.Struct('<Q8s')
+
+MAX_DICTIONARY = 4096
+
+# Columns Parquet should dictionary-encode
+PARQUET_DICTIONARY = ['Course Title', 'Credit Hour', 'Prerequisite']
+
+# Rows per Parquet row group
+PARQUET_ROW_GROUP = 65536
+
+
+def have_pyarrow():
+    """True if pyarrow is installed; does not import it."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def _pyarrow(message):
+    """``(pyarrow, pyarrow.parquet)``, imported on first use since they are slow to load."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(message) from None
+    return pa, pq
+
+
+def _typecode(limit):
+    """Smallest unsigned array typecode holding values up to ``limit``."""
+    for code in ('B', 'H', 'I', 'Q'):
+        if limit < 1 << (8 * array(code).itemsize):
+            return code
+    raise OverflowError(limit)
+
+
+def _le_bytes(values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class _Column:
+    """One column being written: dictionary codes in memory, or a spilled blob."""
+
+    def __init__(self, name):
+        self.name = name
+        self.dictionary = {}
+        self.codes = array('I')
+        self.blob = None
+        self.offsets = None
+
+    def _go_plain(self):
+        values = list(self.dictionary)
+        self.blob = tempfile.TemporaryFile()
+        self.offsets = array('Q', [0])
+        size = 0
+        for code in self.codes:
+            data = values[code].encode('utf-8')
+            self.blob.write(data)
+            size += len(data)
+            self.offsets.append(size)
+        self.dictionary = None
+        self.codes = None
+
+    def append(self, value):
+        if self.dictionary is not None:
+            code = self.dictionary.setdefault(value, len(self.dictionary))
+            self.codes.append(code)
+            rows = len(self.codes)
+            distinct = len(self.dictionary)
+            if distinct > MAX_DICTIONARY or (rows >= 64 and distinct > rows // 2):
+                self._go_plain()
+            return
+        data = value.encode('utf-8')
+        self.blob.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+
+    def finish(self, handle):
+        """Write this column's segments to ``handle``; return its directory entry."""
+        rows = len(self.codes) if self.dictionary is not None else len(self.offsets) - 1
+        if self.dictionary is not None and rows >= 2 and len(self.dictionary) > rows // 2:
+            self._go_plain()
+        if self.dictionary is not None:
+            codes = array(_typecode(max(len(self.dictionary) - 1, 0)), self.codes)
+            start = handle.tell()
+            handle.write(_le_bytes(codes))
+            return {'name': self.name, 'encoding': 'dictionary',
+                    'dictionary': list(self.dictionary), 'type': codes.typecode,
+                    'codes': [start, handle.tell() - start]}
+
+        offsets = array(_typecode(self.offsets[-1]), self.offsets)
+        if offsets.typecode in ('B', 'H'):
+            offsets = array('I', offsets)
+        start = handle.tell()
+        handle.write(_le_bytes(offsets))
+        offsets_entry = [start, handle.tell() - start]
+        start = handle.tell()
+        self.blob.seek(0)
+        while True:
+            data = self.blob.read(1 << 20)
+            if not data:
+                break
+            handle.write(data)
+        self.blob.close()
+        return {'name': self.name, 'encoding': 'plain', 'type': offsets.typecode,
+                'offsets': offsets_entry, 'blob': [start, handle.tell() - start]}
+
+
+class ColumnarSink:
+    """courses.csv columns written in the stdlib columnar layout."""
+
+    def __init__(self, path):
+        self.path = path
+        self.columns = [_Column(name) for name in HEADERS]
+        self.rows = 0
+
+    def write(self, records):
+        count = 0
+        columns = self.columns
+        for record in records:
+            if not record.course_code:
+                continue
+            for column, value in zip(columns, record.as_row()):
+                column.append(value)
+            count += 1
+        self.rows += count
+        return count
+
+    def close(self):
+        with open(self.path, 'wb') as handle:
+            handle.write(MAGIC)
+            entries = [column.finish(handle) for column in self.columns]
+            directory = json.dumps({'rows': self.rows, 'columns': entries},
+                                   ensure_ascii=False).encode('utf-8')
+            handle.write(directory)
+            handle.write(_TRAILER.pack(len(directory), MAGIC))
+
+
+class ParquetSink:
+    """courses.csv columns written as Parquet row groups through pyarrow."""
+
+    def __init__(self, path, row_group=PARQUET_ROW_GROUP):
+        pa, pq = _pyarrow("Parquet output needs pyarrow: pip install pyarrow")
+        self.pa = pa
+        self.path = path
+        self.row_group = row_group
+        self.schema = pa.schema([(name, pa.string()) for name in HEADERS])
+        self.writer = pq.ParquetWriter(path, self.schema, use_dictionary=PARQUET_DICTIONARY)
+        self.buffer = [[] for _ in HEADERS]
+
+    def _flush(self):
+        if self.buffer[0]:
+            self.writer.write_table(self.pa.table(self.buffer, schema=self.schema))
+            self.buffer = [[] for _ in HEADERS]
+
+    def write(self, records):
+        count = 0
+        buffer = self.buffer
+        for record in records:
+            if not record.course_code:
+                continue
+            for values, value in zip(buffer, record.as_row()):
+                values.append(value)
+            count += 1
+            if len(buffer[0]) >= self.row_group:
+                self._flush()
+                buffer = self.buffer
+        return count
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+def columnar_sink(path, engine='auto'):
+    """Parquet if pyarrow is installed (or ``engine='parquet'``), else the stdlib layout."""
+    if engine == 'parquet' or (engine == 'auto' and have_pyarrow()):
+        return ParquetSink(path)
+    return ColumnarSink(path)
+
+
+def _read_array(handle, segment, typecode):
+    start, length = segment
+    handle.seek(start)
+    values = array(typecode)
+    values.frombytes(handle.read(length))
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+class ColumnarFile:
+    """Reads single columns from a stdlib-layout file without touching the rest."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as handle:
+            if handle.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a columnar catalog file")
+            handle.seek(-_TRAILER.size, os.SEEK_END)
+            length, magic = _TRAILER.unpack(handle.read(_TRAILER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is truncated")
+            handle.seek(-_TRAILER.size - length, os.SEEK_END)
+            directory = json.loads(handle.read(length).decode('utf-8'))
+        self.rows = directory['rows']
+        self.entries = {entry['name']: entry for entry in directory['columns']}
+
+    @property
+    def columns(self):
+        return list(self.entries)
+
+    def column(self, name):
+        """Every value of column ``name``, in row order."""
+        entry = self.entries[name]
+        with open(self.path, 'rb') as handle:
+            if entry['encoding'] == 'dictionary':
+                values = entry['dictionary']
+                return [values[code] for code in
+                        _read_array(handle, entry['codes'], entry['type'])]
+            offsets = _read_array(handle, entry['offsets'], entry['type'])
+            start, length = entry['blob']
+            handle.seek(start)
+            blob = handle.read(length)
+        return [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(self.rows)]
+
+
+def read_column(path, name):
+    """One column of a Parquet or stdlib columnar file, as a list of strings."""
+    with open(path, 'rb') as handle:
+        parquet = handle.read(4) == b'PAR1'
+    if parquet:
+        _, pq = _pyarrow("reading Parquet needs pyarrow: pip install pyarrow")
+        return pq.read_table(path, columns=[name]).column(0).to_pylist()
+    return ColumnarFile(path).column(name)
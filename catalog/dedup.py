@@ -0,0 +1,166 @@
+"""Near-duplicate courses across merged catalogs.
+
+The same course often shows up under another code, or with a lightly edited
+syllabus. Each course's normalized Content is cut into word 3-gram shingles
+and reduced to a MinHash signature, which is split into LSH bands. Two
+courses become candidates when any band matches exactly. A candidate pair
+is kept if the Jaccard similarity of the two shingle sets, compared as
+32-bit hashes, reaches ``threshold``. A new course is
+only checked against the first ``bucket_size`` courses of each of its band
+buckets, skipping any already in its cluster, and matches are chained with
+union-find, so the work grows with the number of courses rather than the
+number of pairs.
+
+The signatures use one-permutation hashing: one hash per shingle, with the
+hash's low bits picking a slot and the minimum kept per slot. Empty slots
+are filled from the next non-empty slot. This is far cheaper in pure Python
+than one hash function per slot. Its estimates run high for very short
+texts, which is why candidates are checked on the shingle sets themselves.
+"""
+
+import json
+import zlib
+from array import array
+
+from catalog.record import RecordObserver
+from catalog.search import tokenize_text
+
+NUM_PERM = 128
+BANDS = 32
+
+# Offset that keeps borrowed values in empty slots distinct from real ones
+_BORROW_STEP = 1 << 32
+
+
+def shingles(text, size=3):
+    """Hashes of the word ``size``-grams of the normalized text.
+
+    Texts of ``size`` words or fewer give a single shingle.
+    """
+    words = tokenize_text(text)
+    if len(words) <= size:
+        grams = [' '.join(words)] if words else []
+    else:
+        grams = map(' '.join, zip(*(words[i:] for i in range(size))))
+    crc32 = zlib.crc32
+    return {crc32(gram.encode('utf-8')) for gram in grams}
+
+
+def jaccard(first, second):
+    union = len(first) + len(second)
+    if not union:
+        return 0.0
+    common = len(set(first).intersection(second))
+    return common / (union - common)
+
+
+def signature(hashes, num_perm=NUM_PERM):
+    """One-permutation MinHash signature of a shingle hash set (``num_perm`` slots)."""
+    slots = [None] * num_perm
+    for value in hashes:
+        slot = value % num_perm
+        value //= num_perm
+        if slots[slot] is None or value < slots[slot]:
+            slots[slot] = value
+    if all(value is None for value in slots):
+        return None
+    # Borrow from the next filled slot to the right, wrapping around
+    original = list(slots)
+    for i in range(num_perm):
+        if original[i] is None:
+            distance = 1
+            while original[(i + distance) % num_perm] is None:
+                distance += 1
+            slots[i] = original[(i + distance) % num_perm] + distance * _BORROW_STEP
+    return tuple(slots)
+
+
+class DuplicateFinder(RecordObserver):
+    """Collects courses from a record stream and clusters near-duplicates."""
+
+    def __init__(self, threshold=0.5, num_perm=NUM_PERM, bands=BANDS, bucket_size=16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.bucket_size = bucket_size
+        self.courses = []
+        self.shingles = []
+        self.buckets = {}
+        self.parent = []
+        self.pairs = []
+        self.candidates = 0
+
+    def _find(self, doc):
+        parent = self.parent
+        while parent[doc] != doc:
+            parent[doc] = parent[parent[doc]]
+            doc = parent[doc]
+        return doc
+
+    def add(self, record):
+        code = record.course_code.strip()
+        if not code:
+            return
+        hashes = shingles(record.content)
+        sig = signature(hashes, self.num_perm)
+        doc = len(self.courses)
+        self.courses.append((code, record.course_title.strip()))
+        self.shingles.append(array('I', sorted(hashes)))
+        self.parent.append(doc)
+        if sig is None:
+            return
+        checked = set()
+        root = doc
+        rows = self.rows
+        for band in range(self.bands):
+            key = hash((band,) + sig[band * rows:(band + 1) * rows])
+            members = self.buckets.setdefault(key, [])
+            for other in members:
+                if other in checked:
+                    continue
+                checked.add(other)
+                other_root = self._find(other)
+                if other_root == root:
+                    continue
+                self.candidates += 1
+                score = jaccard(self.shingles[doc], self.shingles[other])
+                if score >= self.threshold:
+                    self.pairs.append((other, doc, score))
+                    self.parent[root] = other_root
+                    root = other_root
+            if len(members) < self.bucket_size:
+                members.append(doc)
+
+    def clusters(self):
+        """Clusters of two or more courses, largest first, with their linking pairs."""
+        groups = {}
+        for doc in range(len(self.courses)):
+            groups.setdefault(self._find(doc), []).append(doc)
+        edges = {}
+        for first, second, score in self.pairs:
+            edges.setdefault(self._find(first), []).append((first, second, score))
+        result = []
+        for root, members in groups.items():
+            if len(members) < 2:
+                continue
+            result.append({
+                'courses': [{'courseCode': self.courses[doc][0],
+                             'courseTitle': self.courses[doc][1]} for doc in members],
+                'pairs': [{'a': self.courses[a][0], 'b': self.courses[b][0],
+                           'similarity': round(score, 4)}
+                          for a, b, score in edges.get(root, [])],
+            })
+        result.sort(key=lambda cluster: -len(cluster['courses']))
+        return result
+
+    def save(self, path):
+        """Write the clusters to ``path`` as JSON; returns them."""
+        clusters = self.clusters()
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump({'threshold': self.threshold, 'courses': len(self.courses),
+                       'candidates': self.candidates, 'clusters': clusters},
+                      handle, indent=2, ensure_ascii=False)
+        return clusters
@@ -0,0 +1,94 @@
+"""Incremental output against a previously generated courses.csv.
+
+Only the digest of each previous row is kept in memory. Current records are
+compared against it as they stream past, so just the added and changed rows
+go on to the writer; codes that never show up again are reported as removed.
+"""
+
+import csv
+import hashlib
+
+from catalog.record import HEADERS
+
+
+def normalize_row(course_code, course_title, credit_hour, prerequisite, content):
+    """Fields as the admin import stores them, so cosmetic edits do not count."""
+    fields = [' '.join(value.split()) for value in
+              (course_code, course_title, credit_hour, prerequisite, content)]
+    try:
+        # "3", "3.0" and "3.00" are the same creditHour once imported
+        fields[2] = format(float(fields[2]), 'g')
+    except ValueError:
+        pass
+    # The import route stores a blank prerequisite as N/A
+    fields[3] = fields[3] or 'N/A'
+    return fields
+
+
+def row_digest(row):
+    """Digest of a row's normalized fields, in ``HEADERS`` order."""
+    joined = '\x1f'.join(normalize_row(*row))
+    return hashlib.blake2b(joined.encode('utf-8'), digest_size=16).digest()
+
+
+def load_digests(csvfile, code_prefix=''):
+    """Map course code -> row digest for a courses.csv written by data2csv.
+
+    With ``code_prefix``, only codes starting with it are loaded, so courses
+    outside a ``--code-prefix`` run are not reported as removed.
+    """
+    reader = csv.reader(csvfile)
+    header = next(reader, None)
+    if header is not None and header != HEADERS:
+        raise ValueError(f"unexpected header {header!r}; expected {HEADERS!r}")
+
+    digests = {}
+    for row in reader:
+        code = row[0].strip() if row else ''
+        if code and code.startswith(code_prefix):
+            digests[code] = row_digest(row)
+    return digests
+
+
+class DeltaFilter:
+    """Pass through only records that are new or differ from ``previous``."""
+
+    def __init__(self, previous):
+        self.previous = previous
+        # Code -> digest of its latest row in this run
+        self.seen = {}
+        self.added = 0
+        self.changed = 0
+        self.unchanged = 0
+
+    def filter(self, records):
+        """Yield added and changed records; may be called once per input chunk.
+
+        A row repeated verbatim within the run (merged catalogs often do) is
+        passed on only once.
+        """
+        previous = self.previous
+        seen = self.seen
+        for record in records:
+            code = record.course_code.strip()
+            if not code:
+                continue
+            digest = row_digest(record.as_row())
+            last = seen.get(code)
+            seen[code] = digest
+            if last == digest:
+                continue
+
+            old = previous.get(code)
+            if last is None and old == digest:
+                self.unchanged += 1
+                continue
+            if last is None and old is None:
+                self.added += 1
+            else:
+                self.changed += 1
+            yield record
+
+    def removed(self):
+        """Previous course codes absent from everything filtered so far."""
+        return [code for code in self.previous if code not in self.seen]
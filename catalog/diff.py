@@ -0,0 +1,313 @@
+"""Changelog between two catalog versions.
+
+    python data2csv.py diff last-year.txt this-year.txt -o changes.txt
+    python data2csv.py diff courses-2025.csv courses-2026.csv --json -o changes.ndjson
+
+Either input may be catalog text or a courses.csv written by data2csv.
+Courses are matched on Course Code and compared field by field after the
+same clean-up that ``--since`` applies (see ``catalog.delta``), so cosmetic
+edits do not count. Changed Content gets a word-level diff. Within one
+input, a repeated code keeps its last row (see ``catalog.record``).
+
+The old catalog is loaded into a hash table keyed by code, and the new one
+streams past it. Only the new rows that differ from the old ones are kept,
+until the report is written. If the table and those rows outgrow the memory
+budget, both inputs are instead sorted by code with ``ExternalSort``, which
+spills runs to disk, and merge-joined. Either way the report lists the
+added, removed and changed courses in code order.
+"""
+
+import argparse
+import csv
+import difflib
+import hashlib
+import json
+import sys
+from itertools import chain, groupby
+from operator import itemgetter
+
+from catalog.delta import normalize_row
+from catalog.extsort import MEMORY_BYTES, ExternalSort, check_budget, row_bytes
+from catalog.record import HEADERS
+from catalog.scanner import scan_records
+
+# Words of unchanged Content shown around each change in the text report
+CONTEXT_WORDS = 4
+
+# Rough cost of one ``seen`` entry: code, digest and dict slot
+_SEEN_BYTES = 160
+
+_code = itemgetter(0)
+
+
+def read_rows(path):
+    """Normalized rows of a catalog text file or courses.csv, in input order."""
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as handle:
+            reader = csv.reader(handle)
+            if next(reader, None) != HEADERS:
+                raise ValueError(f"{path} is not a courses.csv file")
+            for row in reader:
+                if row and row[0].strip():
+                    yield normalize_row(*row)
+        return
+    for record in scan_records([path]):
+        if record.course_code.strip():
+            yield normalize_row(*record.as_row())
+
+
+def _digest(row):
+    return hashlib.blake2b('\x1f'.join(row).encode('utf-8'), digest_size=16).digest()
+
+
+def _latest(rows):
+    """The last row of each run of equal codes in code-sorted ``rows``."""
+    for _, group in groupby(rows, key=_code):
+        for row in group:
+            pass
+        yield row
+
+
+def word_diff(old, new):
+    """``(op, text)`` pieces turning ``old`` into ``new``; op is ``=``, ``-`` or ``+``."""
+    old_words, new_words = old.split(), new.split()
+    matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+    pieces = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            pieces.append(('=', ' '.join(old_words[i1:i2])))
+            continue
+        if i2 > i1:
+            pieces.append(('-', ' '.join(old_words[i1:i2])))
+        if j2 > j1:
+            pieces.append(('+', ' '.join(new_words[j1:j2])))
+    return pieces
+
+
+class CatalogDiff:
+    """Joins two row streams by code and yields what changed."""
+
+    def __init__(self, memory_bytes=MEMORY_BYTES):
+        check_budget(memory_bytes)
+        self.memory_bytes = memory_bytes
+        self.mode = 'hash'
+        self.runs = 0
+        self.added = 0
+        self.removed = 0
+        self.changed = 0
+        self.unchanged = 0
+
+    def changes(self, old_rows, new_rows):
+        """Yield ``(kind, old_row, new_row)`` in code order.
+
+        ``kind`` is ``added`` (no old row), ``removed`` (no new row) or
+        ``changed``.
+        """
+        old_rows, new_rows = iter(old_rows), iter(new_rows)
+        table = {}
+        size = 0
+        for row in old_rows:
+            previous = table.get(row[0])
+            table[row[0]] = row
+            size += row_bytes(row) - (row_bytes(previous) if previous else 0)
+            if size > self.memory_bytes:
+                return self._merge_join(self._drain(table, old_rows), new_rows)
+
+        # Code -> digest of its latest new row, and the rows that differ
+        seen = {}
+        pending = {}
+        for row in new_rows:
+            code = row[0]
+            digest = _digest(row)
+            last = seen.get(code)
+            if last == digest:
+                continue
+            if last is None:
+                size += _SEEN_BYTES
+            seen[code] = digest
+            old = table.get(code)
+            if old is not None and _digest(old) == digest:
+                superseded = pending.pop(code, None)
+                if superseded is not None:
+                    size -= row_bytes(superseded)
+                continue
+            size += row_bytes(row) - (row_bytes(pending[code]) if code in pending else 0)
+            pending[code] = row
+            if size > self.memory_bytes:
+                # Rebuild the new stream so far (latest row per code) from
+                # the pending rows and, for unchanged codes, the old ones
+                so_far = [pending.get(code) or table[code] for code in seen]
+                seen.clear()
+                pending.clear()
+                so_far.reverse()
+                return self._merge_join(self._drain(table, ()),
+                                        chain(self._pop_all(so_far), new_rows))
+        return self._hash_report(table, seen, pending)
+
+    @staticmethod
+    def _pop_all(rows):
+        """Yield and release the rows of a reversed list, last element first."""
+        while rows:
+            yield rows.pop()
+
+    def _drain(self, table, rest):
+        """The table's rows followed by ``rest``, freeing the table as it goes."""
+        rows = list(table.values())
+        table.clear()
+        rows.reverse()
+        return chain(self._pop_all(rows), rest)
+
+    def _hash_report(self, table, seen, pending):
+        self.unchanged = len(seen) - len(pending)
+        removed = [code for code in table if code not in seen]
+        for code in sorted(chain(pending, removed)):
+            old, new = table.get(code), pending.get(code)
+            if new is None:
+                self.removed += 1
+                yield 'removed', table[code], None
+            elif old is None:
+                self.added += 1
+                yield 'added', None, new
+            else:
+                self.changed += 1
+                yield 'changed', old, new
+
+    def _merge_join(self, old_rows, new_rows):
+        self.mode = 'sort-merge'
+        budget = self.memory_bytes // 2
+        old_sort = ExternalSort(_code, budget)
+        new_sort = ExternalSort(_code, budget)
+        old_iter = _latest(old_sort.sort(old_rows))
+        new_iter = _latest(new_sort.sort(new_rows))
+        self.runs = old_sort.runs + new_sort.runs
+        old = next(old_iter, None)
+        new = next(new_iter, None)
+        while old is not None or new is not None:
+            if new is None or (old is not None and old[0] < new[0]):
+                self.removed += 1
+                yield 'removed', old, None
+                old = next(old_iter, None)
+            elif old is None or new[0] < old[0]:
+                self.added += 1
+                yield 'added', None, new
+                new = next(new_iter, None)
+            else:
+                if old == new:
+                    self.unchanged += 1
+                else:
+                    self.changed += 1
+                    yield 'changed', old, new
+                old = next(old_iter, None)
+                new = next(new_iter, None)
+
+
+def _field_changes(old, new):
+    """``(header, old, new)`` for every field but Content that differs."""
+    return [(header, a, b) for header, a, b in zip(HEADERS[1:4], old[1:4], new[1:4])
+            if a != b]
+
+
+def _elide(text, head, tail):
+    """``text`` cut down to its first ``head`` and last ``tail`` words.
+
+    The cut is marked with ``...`` only between the two ends; a span that
+    keeps just one end is trimmed without one.
+    """
+    words = text.split()
+    if len(words) <= head + tail + 1:
+        return text
+    if not head:
+        return ' '.join(words[-tail:] if tail else [])
+    if not tail:
+        return ' '.join(words[:head])
+    return ' '.join(words[:head] + ['...'] + words[-tail:])
+
+
+def format_word_diff(pieces, context=CONTEXT_WORDS):
+    """git --word-diff style text, keeping ``context`` unchanged words by each change."""
+    parts = []
+    last = len(pieces) - 1
+    for index, (op, text) in enumerate(pieces):
+        if op == '-':
+            parts.append(f"[-{text}-]")
+        elif op == '+':
+            parts.append(f"{{+{text}+}}")
+        else:
+            # Unchanged words only matter next to a change: keep the end of
+            # a span before one and the start of a span after one
+            parts.append(_elide(text, context if index > 0 else 0,
+                                context if index < last else 0))
+    return ' '.join(parts)
+
+
+def write_text(changes, out):
+    for kind, old, new in changes:
+        row = new if new is not None else old
+        if kind == 'added':
+            out.write(f"+ {row[0]}  {row[1]}\n")
+            continue
+        if kind == 'removed':
+            out.write(f"- {row[0]}  {row[1]}\n")
+            continue
+        out.write(f"~ {row[0]}  {row[1]}\n")
+        for header, a, b in _field_changes(old, new):
+            out.write(f"    {header}: {a} -> {b}\n")
+        if old[4] != new[4]:
+            out.write(f"    Content: {format_word_diff(word_diff(old[4], new[4]))}\n")
+
+
+def write_json(changes, out):
+    """One JSON object per line for each added, removed or changed course."""
+    for kind, old, new in changes:
+        row = new if new is not None else old
+        entry = {'change': kind, 'courseCode': row[0]}
+        if kind != 'changed':
+            entry['course'] = dict(zip(HEADERS, row))
+        else:
+            entry['fields'] = {header: {'old': a, 'new': b}
+                               for header, a, b in _field_changes(old, new)}
+            if old[4] != new[4]:
+                entry['content'] = word_diff(old[4], new[4])
+        out.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='data2csv.py diff',
+        description="List the courses added, removed and changed between two "
+                    "catalog versions (text or courses.csv).")
+    parser.add_argument('old', help="Earlier catalog")
+    parser.add_argument('new', help="Later catalog")
+    parser.add_argument('-o', '--output', default='-',
+                        help="Report path ('-' writes to stdout). Default: -")
+    parser.add_argument('--json', action='store_true',
+                        help="Write one JSON object per course instead of text")
+    parser.add_argument('--memory-mb', type=float, default=MEMORY_BYTES / 2**20,
+                        help="Memory for rows held by the join before it switches "
+                             "to an on-disk sort-merge, at least 1. Default: 256")
+    args = parser.parse_args(argv)
+
+    try:
+        diff = CatalogDiff(int(args.memory_mb * 2**20))
+    except ValueError as exc:
+        parser.error(f"--memory-mb: {exc}")
+    write = write_json if args.json else write_text
+    try:
+        changes = diff.changes(read_rows(args.old), read_rows(args.new))
+        if args.output == '-':
+            write(changes, sys.stdout)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as out:
+                write(changes, out)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+
+    status = sys.stderr if args.output == '-' else sys.stdout
+    runs = f", {diff.runs} runs spilled" if diff.runs else ""
+    print(f"Diff ({diff.mode} join{runs}): {diff.added} added, {diff.removed} removed, "
+          f"{diff.changed} changed, {diff.unchanged} unchanged.", file=status)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,162 @@
+"""Bulk course eligibility for many students at once.
+
+    python -m catalog.eligibility --index prereqs.json students.ndjson -o eligible.ndjson
+
+Input lines look like ``{"studentId": "...", "completed": ["CSE1201", ...]}``;
+output lines are ``{"studentId": "...", "eligible": [...]}``, listing the
+catalog courses a student has not completed and whose direct prerequisites
+they all have. For an either-or group (``CSE1101 or CSE1102``) one of its
+courses is enough. The index comes from ``data2csv.py --prereq-index``.
+
+The sets are transposed: each course holds one integer bitset with a bit per
+student who completed it. A course's eligible students are then the AND of
+its prerequisites' bitsets (each either-or group first ORed into one) minus
+its own, which is a handful of big-integer
+operations per course for a whole block of students rather than a loop over
+students. Prerequisites outside the catalog (e.g. GED codes in a CSE
+catalog) still count when a student lists them as completed.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from catalog.graph import PrereqIndex, normalize_code
+
+# Set bit positions for every byte value, for turning bitsets back into lists
+_BYTE_BITS = [[bit for bit in range(8) if value >> bit & 1] for value in range(256)]
+
+
+class EligibilityEngine:
+    """Course requirements from a ``PrereqIndex``, ready to evaluate students."""
+
+    def __init__(self, index):
+        self.courses = list(index.codes)
+        catalog = set(self.courses)
+        outside = {code for refs in index.dangling.values() for code in refs}
+        outside.update(code for groups in index.alternatives.values()
+                       for group in groups for code in group if code not in catalog)
+        # Catalog courses first, then prerequisites that only appear as references
+        self.universe = self.courses + sorted(outside)
+        self.position = {code: i for i, code in enumerate(self.universe)}
+        self.requirements = []
+        # Per course, the either-or groups as lists of universe positions
+        self.groups = []
+        for course, prereqs in enumerate(index.prereqs):
+            code = self.courses[course]
+            required = list(prereqs)
+            required += [self.position[ref] for ref in index.dangling.get(code, ())]
+            self.requirements.append(required)
+            self.groups.append([[self.position[ref] for ref in group]
+                                for group in index.alternatives.get(code, ())])
+
+    def _completed_bitsets(self, completed_lists):
+        """One bitset per universe code, with a bit per student who completed it."""
+        width = (len(completed_lists) + 7) // 8
+        columns = {}
+        position = self.position
+        for student, completed in enumerate(completed_lists):
+            byte, bit = divmod(student, 8)
+            for code in completed:
+                course = position.get(code)
+                if course is None:
+                    # Only codes not already in catalog form pay for the regex
+                    course = position.get(normalize_code(code))
+                    if course is None:
+                        continue
+                column = columns.get(course)
+                if column is None:
+                    column = columns[course] = bytearray(width)
+                column[byte] |= 1 << bit
+        bitsets = [0] * len(self.universe)
+        for course, column in columns.items():
+            bitsets[course] = int.from_bytes(column, 'little')
+        return bitsets
+
+    def evaluate(self, completed_lists):
+        """Eligible course codes for each student's list of completed codes."""
+        students = len(completed_lists)
+        everyone = (1 << students) - 1
+        done = self._completed_bitsets(completed_lists)
+        width = (students + 7) // 8
+        eligible = [[] for _ in range(students)]
+        for course, required in enumerate(self.requirements):
+            mask = everyone & ~done[course]
+            for prereq in required:
+                mask &= done[prereq]
+                if not mask:
+                    break
+            for group in self.groups[course]:
+                if not mask:
+                    break
+                either = 0
+                for prereq in group:
+                    either |= done[prereq]
+                mask &= either
+            if not mask:
+                continue
+            code = self.courses[course]
+            for offset, value in enumerate(mask.to_bytes(width, 'little')):
+                if value:
+                    base = offset * 8
+                    for bit in _BYTE_BITS[value]:
+                        eligible[base + bit].append(code)
+        return eligible
+
+
+def _read_blocks(handle, size):
+    block = []
+    for line in handle:
+        if line.strip():
+            block.append(json.loads(line))
+            if len(block) >= size:
+                yield block
+                block = []
+    if block:
+        yield block
+
+
+def run(engine, source, out, block_size=65536):
+    """Stream students from ``source`` to ``out`` in blocks; return the count."""
+    count = 0
+    for block in _read_blocks(source, block_size):
+        results = engine.evaluate([student.get('completed', []) for student in block])
+        for student, courses in zip(block, results):
+            out.write(json.dumps({'studentId': student.get('studentId'),
+                                  'eligible': courses}) + '\n')
+        count += len(block)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compute eligible courses for many students from NDJSON.")
+    parser.add_argument('students', nargs='?', default='-',
+                        help="NDJSON of {studentId, completed}. Default: stdin")
+    parser.add_argument('--index', required=True,
+                        help="Prerequisite index from data2csv.py --prereq-index")
+    parser.add_argument('-o', '--output', default='-',
+                        help="NDJSON output path. Default: stdout")
+    parser.add_argument('--block-size', type=int, default=65536,
+                        help="Students evaluated per pass. Default: 65536")
+    args = parser.parse_args(argv)
+
+    engine = EligibilityEngine(PrereqIndex.load(args.index))
+    source = sys.stdin if args.students == '-' else open(args.students, encoding='utf-8')
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    start = time.perf_counter()
+    try:
+        count = run(engine, source, out, args.block_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    print(f"Evaluated {count} students against {len(engine.courses)} courses "
+          f"in {time.perf_counter() - start:.2f}s.", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,228 @@
+"""Sorting row streams that may not fit in memory.
+
+Rows (lists of strings) are buffered until their estimated size reaches the
+memory budget. The buffer is then sorted and spilled to a temporary CSV file
+as one run. Once the input ends, ``heapq.merge`` k-way merges the runs with
+whatever is still buffered. Input that fits in the budget is sorted in
+memory and never touches disk. The sort is stable, so rows with equal keys
+come out in input order.
+
+No merge reads more than ``MAX_FAN_IN`` runs at once, which keeps the number
+of open temporary files bounded. Whenever that many runs of the same level
+pile up, they are merged into one run of the next level, and the final merge
+first folds the newest runs together until at most ``MAX_FAN_IN`` are left.
+
+``RecordSorter`` applies this to parsed courses for ``--sort-by``. It takes
+records the way a sink does and writes them to the real sink once the input
+is complete. Duplicate course codes are resolved while the runs are merged
+by code. The first row or the last row can be kept, or the rows can be
+merged so that later non-empty fields win. Any other sort order is a second
+pass over the deduplicated stream.
+"""
+
+import csv
+import heapq
+import tempfile
+from itertools import groupby
+
+from catalog.record import FIELDS, record_class, record_row
+from catalog.writers import credit_hour_value
+
+# Default budget for buffered rows
+MEMORY_BYTES = 256 * 1024 * 1024
+
+# Smallest budget accepted; less spills a run every few rows
+MIN_MEMORY_BYTES = 1024 * 1024
+
+# Most runs read by one merge, and so open at once per sort
+MAX_FAN_IN = 64
+
+# Rough per-row cost of the list and str objects, beyond the text itself
+ROW_OVERHEAD = 64 + 5 * 56
+
+DUPLICATE_POLICIES = ('keep-first', 'keep-last', 'merge')
+
+
+def row_bytes(row):
+    """Estimated in-memory size of ``row``."""
+    return ROW_OVERHEAD + sum(map(len, row))
+
+
+def check_budget(memory_bytes):
+    """Raise ``ValueError`` if ``memory_bytes`` is below ``MIN_MEMORY_BYTES``."""
+    if memory_bytes < MIN_MEMORY_BYTES:
+        raise ValueError(f"the memory budget must be at least "
+                         f"{MIN_MEMORY_BYTES // 2**20} MB")
+
+
+class ExternalSort:
+    """Sorts rows by ``key`` within ``memory_bytes``, spilling runs to disk.
+
+    Rows are added with ``extend`` (as often as needed), then ``merged``
+    yields them all in order, once.
+    """
+
+    def __init__(self, key, memory_bytes=MEMORY_BYTES):
+        self.key = key
+        self.memory_bytes = memory_bytes
+        self.buffer = []
+        self.size = 0
+        self.files = []
+        # Merge level of each file: 0 for a spilled buffer, +1 per merge
+        self.levels = []
+        self.runs = 0
+        self.rows = 0
+
+    @staticmethod
+    def _write_run(rows):
+        run = tempfile.TemporaryFile('w+', newline='', encoding='utf-8')
+        csv.writer(run).writerows(rows)
+        run.seek(0)
+        return run
+
+    def _merge_tail(self, count):
+        """Merge the newest ``count`` runs into one; adjacent runs keep it stable."""
+        files = self.files[-count:]
+        level = max(self.levels[-count:]) + 1
+        try:
+            run = self._write_run(heapq.merge(*(csv.reader(f) for f in files),
+                                              key=self.key))
+        finally:
+            for old in files:
+                old.close()
+        del self.files[-count:]
+        del self.levels[-count:]
+        self.files.append(run)
+        self.levels.append(level)
+
+    def _spill(self):
+        self.buffer.sort(key=self.key)
+        self.files.append(self._write_run(self.buffer))
+        self.levels.append(0)
+        self.runs += 1
+        self.buffer = []
+        self.size = 0
+        # Like a binary counter in base MAX_FAN_IN: levels never rise along the list
+        while (len(self.levels) >= MAX_FAN_IN
+               and self.levels[-MAX_FAN_IN] == self.levels[-1]):
+            self._merge_tail(MAX_FAN_IN)
+
+    def extend(self, rows):
+        for row in rows:
+            self.buffer.append(row)
+            self.rows += 1
+            self.size += row_bytes(row)
+            if self.size >= self.memory_bytes:
+                self._spill()
+
+    def merged(self):
+        """Yield every row added so far, sorted by ``key``."""
+        buffer = self.buffer
+        self.buffer = []
+        buffer.sort(key=self.key)
+        try:
+            if not self.files:
+                yield from buffer
+                return
+            while len(self.files) >= MAX_FAN_IN:
+                # One slot of the final merge is the buffer
+                self._merge_tail(min(MAX_FAN_IN, len(self.files) - MAX_FAN_IN + 2))
+            # The buffered rows come last, so equal keys keep input order
+            yield from heapq.merge(*(csv.reader(run) for run in self.files), buffer,
+                                   key=self.key)
+        finally:
+            for run in self.files:
+                run.close()
+            self.files = []
+            self.levels = []
+
+    def sort(self, rows):
+        """Add ``rows`` and return the iterator over all rows in order."""
+        self.extend(rows)
+        return self.merged()
+
+
+def _code(row):
+    return row[0].strip()
+
+
+def _merge_rows(rows):
+    """One row from several with the same code: later non-empty fields win."""
+    merged = list(rows[0])
+    for row in rows[1:]:
+        for i, value in enumerate(row):
+            if value.strip():
+                merged[i] = value
+    return merged
+
+
+def _column_key(field):
+    index = FIELDS.index(field)
+    if field == 'course_code':
+        return lambda row: row[index].strip()
+    if field == 'credit_hour':
+        return lambda row: credit_hour_value(row[index])
+    # Titles and text sort case-insensitively
+    return lambda row: row[index].strip().casefold()
+
+
+def sort_key(columns):
+    """Row key for ordering by ``columns`` (``FIELDS`` names), in priority order."""
+    keys = [_column_key(field) for field in columns]
+    if len(keys) == 1:
+        return keys[0]
+    return lambda row: tuple(key(row) for key in keys)
+
+
+class RecordSorter:
+    """Buffers records like a sink, then writes them to a sink in order."""
+
+    def __init__(self, columns=('course_code',), duplicates='keep-last',
+                 memory_bytes=MEMORY_BYTES, textbooks=False):
+        for field in columns:
+            if field not in FIELDS:
+                raise ValueError(f"cannot sort by {field!r}; choose from {', '.join(FIELDS)}")
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ValueError(f"unknown duplicate policy {duplicates!r}")
+        check_budget(memory_bytes)
+        self.columns = tuple(columns)
+        self.duplicates = duplicates
+        self.by_code = self.columns == ('course_code',)
+        # A second ordering pass shares the budget with the first one's merge
+        budget = memory_bytes if self.by_code else memory_bytes // 2
+        self.memory_bytes = memory_bytes
+        # Whether rows carry the Textbook text after the five fields
+        self.textbooks = textbooks
+        self.first = ExternalSort(_code, budget)
+        self.second = None if self.by_code else ExternalSort(sort_key(self.columns), budget)
+        self.dropped = 0
+
+    @property
+    def runs(self):
+        return self.first.runs + (self.second.runs if self.second is not None else 0)
+
+    def write(self, records):
+        """Buffer ``records``; returns how many were taken."""
+        before = self.first.rows
+        self.first.extend(record_row(record) for record in records if record.course_code)
+        return self.first.rows - before
+
+    def _unique(self):
+        """Rows in code order with each duplicate code resolved by the policy."""
+        for _, group in groupby(self.first.merged(), key=_code):
+            rows = list(group)
+            self.dropped += len(rows) - 1
+            if len(rows) == 1 or self.duplicates == 'keep-first':
+                yield rows[0]
+            elif self.duplicates == 'keep-last':
+                yield rows[-1]
+            else:
+                yield _merge_rows(rows)
+
+    def write_to(self, sink):
+        """Write everything buffered to ``sink`` in order; returns its count."""
+        rows = self._unique()
+        if self.second is not None:
+            rows = self.second.sort(rows)
+        make_record = record_class(self.textbooks)
+        return sink.write(make_record(*row) for row in rows)
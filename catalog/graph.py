@@ -0,0 +1,304 @@
+"""Prerequisite graph index.
+
+The free-text ``Prerequisite`` column (``CSE1201, CSE1202``,
+``CSE2103 & CSE2104``, ``GED 2248, 2243``) is split once into normalized
+course codes. Either-or pieces (``CSE1101 or CSE1102``, ``MAT1101/MAT1102``)
+become alternative groups, any one of whose codes meets the requirement.
+``PrereqIndex`` then precomputes a topological order, a depth per course and
+transitive prerequisite/dependent sets stored as integer bitsets, so queries
+are a bit test or a scan of one bitset. The closures follow the codes that
+are always required; the groups are kept alongside them for eligibility and
+planning. Cycles (strongly connected components) and references to codes
+missing from the catalog are reported at build time. ``save``/``load`` round-trip the index as JSON so
+downstream tools do not re-parse the catalog.
+"""
+
+import json
+import re
+
+from catalog.record import RecordObserver
+
+# Requirements that must all be met; "and/or" is an alternative, not one of these
+_SEPARATORS = re.compile(r'\s*(?:,|&|;|\band\b(?!\s*/))\s*', re.IGNORECASE)
+_ALTERNATIVES = re.compile(r'\s*(?:\band\s*/\s*or\b|\bor\b|/)\s*', re.IGNORECASE)
+_CODE = re.compile(r'^([A-Za-z]{2,4})\s*(\d{3,5}[A-Za-z]?)$')
+_BARE_NUMBER = re.compile(r'^\d{3,5}[A-Za-z]?$')
+_NONE = {'', 'n/a', 'na', 'none', '-', 'nil'}
+
+
+def normalize_code(code):
+    """``"CSE 2102"`` -> ``"CSE2102"``; anything else is only trimmed."""
+    code = code.strip()
+    match = _CODE.match(code)
+    if match:
+        return (match.group(1) + match.group(2)).upper()
+    return code
+
+
+def _piece_code(piece, department):
+    """``(code, department)`` for one piece, or ``(None, department)`` if it is no code."""
+    match = _CODE.match(piece)
+    if match:
+        department = match.group(1).upper()
+        return department + match.group(2).upper(), department
+    if department and _BARE_NUMBER.match(piece):
+        return department + piece.upper(), department
+    return None, department
+
+
+def parse_prerequisites(text):
+    """Split a Prerequisite cell into ``(codes, notes, groups)``.
+
+    Bare numbers borrow the department of the code before them, so
+    ``GED 2248, 2243`` gives ``GED2248`` and ``GED2243``. An either-or piece
+    (``CSE1101 or 1102``) becomes a group, a list of codes of which any one
+    will do. Pieces that are not course codes (``All Major Core Courses``),
+    and either-or pieces with such an alternative, are returned as notes.
+    """
+    if text.strip().lower() in _NONE:
+        return [], [], []
+    codes = []
+    notes = []
+    groups = []
+    department = None
+    for piece in _SEPARATORS.split(text.strip()):
+        if not piece:
+            continue
+        group = []
+        for alternative in _ALTERNATIVES.split(piece):
+            code, department = _piece_code(alternative, department)
+            if code is None:
+                group = None
+                break
+            if code not in group:
+                group.append(code)
+        if group is None:
+            notes.append(piece)
+        elif len(group) > 1:
+            if group not in groups:
+                groups.append(group)
+        elif group[0] not in codes:
+            codes.append(group[0])
+    return codes, notes, groups
+
+
+def set_bits(mask):
+    """Indices of the set bits in ``mask``, lowest first."""
+    indices = []
+    while mask:
+        low = mask & -mask
+        indices.append(low.bit_length() - 1)
+        mask ^= low
+    return indices
+
+
+def _strongly_connected(prereqs):
+    """Tarjan's algorithm, iteratively; components come out prerequisites first."""
+    count = len(prereqs)
+    index_of = [-1] * count
+    lowlink = [0] * count
+    on_stack = [False] * count
+    stack = []
+    components = []
+    counter = 0
+    for root in range(count):
+        if index_of[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, edge = work.pop()
+            if edge == 0:
+                index_of[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            recurse = False
+            edges = prereqs[node]
+            while edge < len(edges):
+                nxt = edges[edge]
+                edge += 1
+                if index_of[nxt] == -1:
+                    work.append((node, edge))
+                    work.append((nxt, 0))
+                    recurse = True
+                    break
+                if on_stack[nxt]:
+                    lowlink[node] = min(lowlink[node], index_of[nxt])
+            if recurse:
+                continue
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+    return components
+
+
+class PrereqIndex:
+    """Courses, their direct prerequisites and the precomputed closures.
+
+    ``alternatives`` maps a code to its either-or groups, each a list of
+    codes (in the catalog or not) of which one must be completed.
+    """
+
+    def __init__(self, codes, prereqs, notes=None, dangling=None, alternatives=None):
+        self.codes = list(codes)
+        self.prereqs = [sorted(set(p)) for p in prereqs]
+        self.notes = notes or {}
+        self.dangling = dangling or {}
+        self.alternatives = alternatives or {}
+        self._compute()
+
+    def _compute(self):
+        count = len(self.codes)
+        components = _strongly_connected(self.prereqs)
+        self.cycles = [[self.codes[i] for i in component] for component in components
+                       if len(component) > 1 or component[0] in self.prereqs[component[0]]]
+        self.order = [i for component in components for i in component]
+
+        component_of = [0] * count
+        for number, component in enumerate(components):
+            for member in component:
+                component_of[member] = number
+
+        # Prerequisites first: every outside prerequisite is already final
+        ancestors = [0] * count
+        depth = [0] * count
+        for number, component in enumerate(components):
+            mask = 0
+            level = 0
+            for member in component:
+                for prereq in self.prereqs[member]:
+                    if component_of[prereq] != number:
+                        mask |= ancestors[prereq] | (1 << prereq)
+                        level = max(level, depth[prereq] + 1)
+            if len(component) > 1 or component[0] in self.prereqs[component[0]]:
+                # Every member of a cycle transitively requires every member
+                for member in component:
+                    mask |= 1 << member
+            for member in component:
+                ancestors[member] = mask
+                depth[member] = level
+        self.ancestors = ancestors
+        self.depth_of = depth
+        self._derive()
+
+    def _derive(self):
+        """Reverse edges, dependent bitsets and order positions, from the rest."""
+        count = len(self.codes)
+        self.position = {code: i for i, code in enumerate(self.codes)}
+        self.direct_dependents = [[] for _ in range(count)]
+        for course, prereqs in enumerate(self.prereqs):
+            for prereq in prereqs:
+                self.direct_dependents[prereq].append(course)
+        self.descendants = [0] * count
+        for course, mask in enumerate(self.ancestors):
+            for prereq in set_bits(mask):
+                self.descendants[prereq] |= 1 << course
+        self.order_position = [0] * count
+        for position, course in enumerate(self.order):
+            self.order_position[course] = position
+
+    def _codes(self, mask):
+        order = self.order_position
+        return [self.codes[i] for i in sorted(set_bits(mask), key=order.__getitem__)]
+
+    def _index(self, code):
+        return self.position[normalize_code(code)]
+
+    def direct_prereqs(self, code):
+        return [self.codes[i] for i in self.prereqs[self._index(code)]]
+
+    def all_prereqs(self, code):
+        """Every course ``code`` transitively requires, in topological order."""
+        return self._codes(self.ancestors[self._index(code)])
+
+    def dependents(self, code, transitive=True):
+        """Courses that (transitively) require ``code``, in topological order."""
+        course = self._index(code)
+        if not transitive:
+            return [self.codes[i] for i in self.direct_dependents[course]]
+        return self._codes(self.descendants[course])
+
+    def requires(self, code, prereq):
+        """True if ``prereq`` is a transitive prerequisite of ``code``."""
+        return bool(self.ancestors[self._index(code)] >> self._index(prereq) & 1)
+
+    def depth(self, code):
+        """Length of the longest prerequisite chain below ``code``."""
+        return self.depth_of[self._index(code)]
+
+    def topological_order(self):
+        return [self.codes[i] for i in self.order]
+
+    def to_dict(self):
+        return {
+            'codes': self.codes,
+            'prereqs': self.prereqs,
+            'order': self.order,
+            'depth': self.depth_of,
+            'ancestors': [format(mask, 'x') for mask in self.ancestors],
+            'cycles': self.cycles,
+            'dangling': self.dangling,
+            'notes': self.notes,
+            'alternatives': self.alternatives,
+        }
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.to_dict(), handle, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index without recomputing its closures."""
+        with open(path, encoding='utf-8') as handle:
+            data = json.load(handle)
+        index = cls.__new__(cls)
+        index.codes = data['codes']
+        index.prereqs = data['prereqs']
+        index.notes = data['notes']
+        index.dangling = data['dangling']
+        index.alternatives = data.get('alternatives', {})
+        index.order = data['order']
+        index.depth_of = data['depth']
+        index.cycles = data['cycles']
+        index.ancestors = [int(mask, 16) for mask in data['ancestors']]
+        index._derive()
+        return index
+
+
+class PrereqIndexBuilder(RecordObserver):
+    """Collects prerequisites from a record stream, then builds the index."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def add(self, record):
+        code = normalize_code(record.course_code)
+        if code:
+            self.entries[code] = parse_prerequisites(record.prerequisite)
+
+    def build(self):
+        codes = list(self.entries)
+        position = {code: i for i, code in enumerate(codes)}
+        prereqs = []
+        notes = {}
+        dangling = {}
+        alternatives = {}
+        for code, (refs, text, groups) in self.entries.items():
+            prereqs.append([position[ref] for ref in refs if ref in position])
+            missing = [ref for ref in refs if ref not in position]
+            if missing:
+                dangling[code] = missing
+            if text:
+                notes[code] = text
+            if groups:
+                alternatives[code] = groups
+        return PrereqIndex(codes, prereqs, notes, dangling, alternatives)
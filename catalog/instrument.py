@@ -0,0 +1,150 @@
+"""Opt-in per-stage timers and counters for the conversion pipeline.
+
+Nothing here runs unless a ``Profiler`` is created: the pipeline is only
+wrapped in these generators when ``--profile`` is given, so a normal run
+pays nothing. Each wrapper times the ``next()`` calls into the stage it
+wraps, which includes every stage upstream of it; the report subtracts the
+upstream time to give each stage its own share.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+# Name used in field_hits for lines that carry no label
+CONTINUATION = 'continuation'
+
+
+class Profiler:
+    """Collects stage timings, field hit counts and bytes read for one run."""
+
+    def __init__(self, capture=None):
+        # name -> [inclusive seconds, items]; insertion order is pipeline order
+        self.stages = {}
+        self.field_hits = Counter()
+        self.bytes_read = 0
+        self.capture = capture
+        self._profile = None
+        self._snapshot = None
+        self._peak = 0
+        self._started = time.perf_counter()
+        self._finished = None
+
+    def timed(self, name, iterable):
+        """Pass ``iterable`` through, timing each item it takes to produce.
+
+        The stage is registered now rather than on first ``next()``, so stages
+        are listed in the order the pipeline was built.
+        """
+        return self._timed(self.stages.setdefault(name, [0.0, 0]), iterable)
+
+    @staticmethod
+    def _timed(stats, iterable):
+        clock = time.perf_counter
+        iterator = iter(iterable)
+        while True:
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                stats[0] += clock() - start
+                return
+            stats[0] += clock() - start
+            stats[1] += 1
+            yield item
+
+    def lines(self, lines):
+        """The ``read`` stage: time raw line input and count its UTF-8 bytes."""
+        return self._count_bytes(self.timed('read', lines))
+
+    def _count_bytes(self, lines):
+        for line in lines:
+            self.bytes_read += len(line.encode('utf-8'))
+            yield line
+
+    def tokens(self, tokens):
+        """The ``classify`` stage: time ``tokenize`` and count hits per field."""
+        return self._count_fields(self.timed('classify', tokens))
+
+    def _count_fields(self, tokens):
+        hits = self.field_hits
+        for token in tokens:
+            hits[token[0] or CONTINUATION] += 1
+            yield token
+
+    @contextmanager
+    def section(self, name):
+        """Time a block of code as one stage, e.g. the CSV writer."""
+        stats = self.stages.setdefault(name, [0.0, 0])
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats[0] += time.perf_counter() - start
+
+    @contextmanager
+    def capturing(self):
+        """Run the block under cProfile or tracemalloc if ``capture`` asks for it."""
+        if self.capture == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.capture == 'tracemalloc':
+            tracemalloc.start()
+        try:
+            yield
+        finally:
+            if self.capture == 'cprofile':
+                self._profile.disable()
+            elif self.capture == 'tracemalloc':
+                self._snapshot = tracemalloc.take_snapshot()
+                self._peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self._finished = time.perf_counter()
+
+    def _capture_report(self, top):
+        if self.capture == 'cprofile':
+            out = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=out)
+            stats.sort_stats('cumulative').print_stats(top)
+            return {'cprofile': out.getvalue()}
+        if self.capture == 'tracemalloc':
+            sites = self._snapshot.statistics('lineno')[:top]
+            return {'tracemalloc': {
+                'peak_bytes': self._peak,
+                'top': [{'site': str(stat.traceback), 'bytes': stat.size,
+                         'blocks': stat.count} for stat in sites],
+            }}
+        return {}
+
+    def report(self, top=25):
+        """The run as a JSON-ready dict."""
+        finished = self._finished or time.perf_counter()
+        stages = {}
+        upstream = 0.0
+        for name, (inclusive, items) in self.stages.items():
+            stages[name] = {
+                'seconds': max(inclusive - upstream, 0.0),
+                'inclusive_seconds': inclusive,
+                'items': items,
+            }
+            upstream = inclusive
+        report = {
+            'total_seconds': finished - self._started,
+            'stages': stages,
+            'field_hits': dict(self.field_hits),
+            'bytes_read': self.bytes_read,
+        }
+        report.update(self._capture_report(top))
+        return report
+
+    def write(self, path, **extra):
+        """Write ``report()`` plus ``extra`` keys to ``path`` as JSON."""
+        report = self.report()
+        report.update(extra)
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
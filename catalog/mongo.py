@@ -0,0 +1,165 @@
+"""Bulk upsert loader for the ``admincourses`` collection.
+
+Replaces the import route's findOne + update/create round trips per row with
+batched ``bulk_write`` upserts keyed on the unique ``courseCode`` index. The
+result has the same shape as the route's ``ImportResult``.
+
+Batches run in parallel lanes. A course code always hashes to the same lane,
+and each lane applies its batches in order, so repeated codes end up with
+their last row exactly as the route's sequential loop would leave them.
+"""
+
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from catalog.writers import course_import
+
+try:
+    from pymongo import MongoClient, UpdateOne
+    from pymongo.errors import BulkWriteError
+except ImportError:  # optional: only needed for --format mongo
+    MongoClient = UpdateOne = BulkWriteError = None
+
+COLLECTION = 'admincourses'
+
+
+def connect(uri, database=None):
+    """The ``admincourses`` collection for ``uri`` (database from the URI by default)."""
+    if MongoClient is None:
+        raise ImportError("loading into MongoDB needs pymongo: pip install pymongo")
+    client = MongoClient(uri)
+    db = client[database] if database else client.get_default_database()
+    return db[COLLECTION]
+
+
+def empty_result():
+    return {'updated': 0, 'created': 0, 'errors': [],
+            'details': {'updated': [], 'created': []}}
+
+
+def _validate(course):
+    """The route's per-row checks; returns an error message or None."""
+    if not course['courseCode'] or not course['courseTitle']:
+        return 'Missing required fields (courseCode, courseTitle, or creditHour)'
+    if not 0 <= course['creditHour'] <= 10:
+        return 'Credit hour must be a number between 0 and 10'
+    return None
+
+
+def _upsert(course, now):
+    fields = {key: value for key, value in course.items() if key != 'courseCode'}
+    fields['updatedAt'] = now
+    return UpdateOne(
+        {'courseCode': course['courseCode']},
+        {'$set': fields, '$setOnInsert': {'createdAt': now, '__v': 0}},
+        upsert=True,
+    )
+
+
+def run_batch(collection, batch):
+    """Upsert ``batch`` of ``(row, course)`` pairs; return a partial result."""
+    now = datetime.now(timezone.utc)
+    failed = {}
+    try:
+        outcome = collection.bulk_write([_upsert(course, now) for _, course in batch],
+                                        ordered=False)
+        upserted = set(outcome.upserted_ids)
+    except BulkWriteError as exc:
+        upserted = {item['index'] for item in exc.details.get('upserted', [])}
+        failed = {error['index']: error.get('errmsg', 'Unknown error')
+                  for error in exc.details.get('writeErrors', [])}
+    except Exception as exc:
+        # Connection-level failures lose the whole batch, like per-row catches would
+        upserted = set()
+        failed = {index: str(exc) or 'Unknown error' for index in range(len(batch))}
+
+    result = empty_result()
+    for index, (row, course) in enumerate(batch):
+        if index in failed:
+            result['errors'].append({'row': row, 'error': failed[index], 'data': course})
+            continue
+        kind = 'created' if index in upserted else 'updated'
+        result[kind] += 1
+        result['details'][kind].append({'courseCode': course['courseCode'],
+                                        'courseTitle': course['courseTitle']})
+    return result
+
+
+def merge_result(total, part):
+    total['updated'] += part['updated']
+    total['created'] += part['created']
+    total['errors'].extend(part['errors'])
+    total['details']['updated'].extend(part['details']['updated'])
+    total['details']['created'].extend(part['details']['created'])
+
+
+class MongoSink:
+    """Output sink that upserts records into ``collection`` in parallel batches.
+
+    ``collection`` only needs a pymongo-compatible ``bulk_write``, so tests can
+    pass an in-process stand-in such as mongomock. Row numbers in errors count
+    from 2, as in the route (row 1 being the spreadsheet header).
+    """
+
+    def __init__(self, collection, batch_size=1000, parallel=4):
+        if UpdateOne is None:
+            raise ImportError("loading into MongoDB needs pymongo: pip install pymongo")
+        if batch_size < 1 or parallel < 1:
+            raise ValueError("batch_size and parallel must be at least 1")
+        self.collection = collection
+        self.batch_size = batch_size
+        self.parallel = parallel
+        self.result = empty_result()
+        self._row = 1
+        self._lanes = [ThreadPoolExecutor(max_workers=1) for _ in range(parallel)]
+        self._buffers = [[] for _ in range(parallel)]
+        self._codes = [set() for _ in range(parallel)]
+        self._pending = deque()
+
+    def write(self, records):
+        count = 0
+        for record in records:
+            if not record.course_code:
+                continue
+            self._row += 1
+            count += 1
+            course = course_import(record)
+            error = _validate(course)
+            if error:
+                self.result['errors'].append({'row': self._row, 'error': error,
+                                              'data': course})
+                continue
+
+            lane = zlib.crc32(course['courseCode'].encode('utf-8')) % self.parallel
+            # A repeated code starts a new batch so its upserts stay in order
+            if course['courseCode'] in self._codes[lane]:
+                self._submit(lane)
+            self._buffers[lane].append((self._row, course))
+            self._codes[lane].add(course['courseCode'])
+            if len(self._buffers[lane]) >= self.batch_size:
+                self._submit(lane)
+        return count
+
+    def _submit(self, lane):
+        batch = self._buffers[lane]
+        if not batch:
+            return
+        self._buffers[lane] = []
+        self._codes[lane] = set()
+        self._pending.append(self._lanes[lane].submit(run_batch, self.collection, batch))
+        # Bound the batches held in memory while the database catches up
+        while len(self._pending) > 2 * self.parallel:
+            merge_result(self.result, self._pending.popleft().result())
+
+    def close(self):
+        """Flush partial batches, wait for every lane and return the result."""
+        for lane in range(self.parallel):
+            self._submit(lane)
+        while self._pending:
+            merge_result(self.result, self._pending.popleft().result())
+        for executor in self._lanes:
+            executor.shutdown()
+        self.result['errors'].sort(key=lambda error: error['row'])
+        return self.result
@@ -0,0 +1,81 @@
+"""Process-pool parsing of large catalog files.
+
+Each file is cut into chunks that begin on a ``Course Code:`` line, the
+chunks are scanned in worker processes, and the records are yielded back in
+their original order.
+"""
+
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog.parser import decode_error
+from catalog.record import record_class, record_row
+from catalog.scanner import chunk_bounds, scan_buffer, scan_records
+
+# Target bytes per task; large enough to amortise pickling the results
+CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def _scan_chunk(path, start, end, code_prefix, textbooks):
+    """Worker entry point: parse one record-aligned byte span of ``path``.
+
+    Rows are returned as plain lists, which pickle far faster than slotted
+    records. The Textbook text is appended only when ``textbooks`` is set.
+    """
+    with open(path, 'rb') as handle:
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            records = scan_buffer(buf[start:end], code_prefix, textbooks)
+            try:
+                return [record_row(record) for record in records]
+            except UnicodeDecodeError as exc:
+                raise decode_error(path, exc) from None
+
+
+def _records(future, textbooks):
+    """Rebuild the ``CourseRecord`` objects from a finished chunk."""
+    make_record = record_class(textbooks)
+    return (make_record(*row) for row in future.result())
+
+
+def _file_chunks(path, chunk_bytes):
+    """Record-aligned ``(start, end)`` spans of ``path``; empty files have none."""
+    if os.path.getsize(path) == 0:
+        return []
+    with open(path, 'rb') as handle:
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return chunk_bounds(buf, chunk_bytes)
+
+
+def parse_parallel(paths, workers, code_prefix='', chunk_bytes=CHUNK_BYTES, textbooks=False,
+                   pool=None):
+    """Yield records from ``paths`` in input order, parsed by ``workers`` processes.
+
+    At most ``2 * workers`` chunks are in flight, so finished chunks waiting
+    behind a slow one do not pile up in memory. ``-`` is read from stdin in
+    this process. ``pool``, if given, is a ``ProcessPoolExecutor`` to reuse.
+    """
+    if pool is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from parse_parallel(paths, workers, code_prefix, chunk_bytes, textbooks,
+                                      pool)
+        return
+
+    pending = deque()
+    for path in paths:
+        if path == '-':
+            # Drain everything queued so far to keep the output in order
+            while pending:
+                yield from _records(pending.popleft(), textbooks)
+            yield from scan_records(['-'], code_prefix, textbooks)
+            continue
+
+        for start, end in _file_chunks(path, chunk_bytes):
+            pending.append(pool.submit(_scan_chunk, path, start, end, code_prefix,
+                                       textbooks))
+            if len(pending) >= 2 * workers:
+                yield from _records(pending.popleft(), textbooks)
+
+    while pending:
+        yield from _records(pending.popleft(), textbooks)
@@ -0,0 +1,128 @@
+"""Line-oriented parser for pasted course catalog text.
+
+Records are yielded one at a time as soon as the next ``Course Code:`` line
+closes them, so memory use does not grow with the size of the catalog.
+"""
+
+import sys
+
+from catalog.record import record_class
+
+# Field for the "Textbook:" label. It ends a content block, and its text is
+# only kept when the parser is asked for textbooks.
+TEXTBOOK = 'textbook'
+
+# Label text before the first colon -> CourseRecord attribute it fills. A line
+# is classified with one partition and one dict lookup instead of a chain of
+# startswith().
+FIELD_LABELS = {
+    'Course Code': 'course_code',
+    'Course Title': 'course_title',
+    'Credit Hour': 'credit_hour',
+    'Prerequisite': 'prerequisite',
+    # Note: Text uses both "Content:" and "Contents:"
+    'Content': 'content',
+    'Contents': 'content',
+    'Textbook': TEXTBOOK,
+}
+
+# Fields whose value continues over following unlabelled lines
+MULTILINE_FIELDS = frozenset({'content'})
+
+
+def decode_error(path, exc):
+    """``ValueError`` naming ``path`` for a ``UnicodeDecodeError`` raised reading it."""
+    return ValueError(f"{path} is not UTF-8 text ({exc.reason})")
+
+
+def iter_lines(paths):
+    """Yield lines lazily from each path in turn; ``-`` reads stdin.
+
+    A leading UTF-8 byte order mark is dropped, and text that is not UTF-8
+    raises ``ValueError`` naming the file.
+    """
+    for path in paths:
+        if path == '-':
+            yield from sys.stdin
+            continue
+        with open(path, encoding='utf-8-sig') as handle:
+            try:
+                yield from handle
+            except UnicodeDecodeError as exc:
+                raise decode_error(path, exc) from None
+
+
+def tokenize(lines):
+    """Yield ``(field, value)`` for every non-blank line.
+
+    ``field`` is ``None`` for lines that do not start with a known label;
+    those are continuation lines and ``value`` is the whole stripped line.
+    """
+    labels = FIELD_LABELS
+    for line in lines:
+        clean_line = line.strip()
+
+        # Blank lines never carry data, even inside a multi-line content block
+        if not clean_line:
+            continue
+
+        label, colon, value = clean_line.partition(':')
+        field = labels.get(label) if colon else None
+        if field is None:
+            yield None, clean_line
+        else:
+            yield field, value.strip()
+
+
+def parse_records(lines, textbooks=False):
+    """Yield one ``CourseRecord`` per ``Course Code:`` block found in ``lines``."""
+    return parse_tokens(tokenize(lines), textbooks)
+
+
+def parse_tokens(tokens, textbooks=False):
+    """Assemble ``tokenize`` output into ``CourseRecord`` objects.
+
+    Multi-line fields are collected as a list of fragments and joined once
+    when the next label closes them, so long syllabus blocks cost linear time.
+    Lines before the first ``Course Code:`` belong to no course and are skipped.
+    With ``textbooks``, the records are ``TextbookRecord`` objects carrying
+    the Textbook block's text; otherwise that block is dropped.
+    """
+    make_record = record_class(textbooks)
+    multiline = MULTILINE_FIELDS | {TEXTBOOK} if textbooks else MULTILINE_FIELDS
+    current_course = None
+    # Field currently accepting continuation lines, and its pieces so far
+    open_field = None
+    fragments = []
+
+    for field, value in tokens:
+        if field is None:
+            if open_field is not None:
+                # Continuation of a multi-line content or textbook block
+                fragments.append(value)
+            continue
+
+        if open_field is not None:
+            setattr(current_course, open_field, " ".join(fragments))
+            open_field = None
+
+        if field == 'course_code':
+            # The previous course is complete once the next one starts
+            if current_course is not None:
+                yield current_course
+            current_course = make_record(value)
+
+        elif current_course is None or (field is TEXTBOOK and not textbooks):
+            continue
+
+        elif field in multiline:
+            open_field = field
+            fragments = [value]
+
+        else:
+            setattr(current_course, field, value)
+
+    if open_field is not None:
+        setattr(current_course, open_field, " ".join(fragments))
+    if current_course is not None:
+        yield current_course
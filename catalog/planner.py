@@ -0,0 +1,396 @@
+"""Semester-by-semester course plans from courses.csv.
+
+    python -m catalog.planner courses.csv --require CSE1101 CSE2203 --cap 15
+    python -m catalog.planner courses.csv --batch students.ndjson -o plans.ndjson
+
+A plan schedules every required course, plus the catalog prerequisites they
+pull in, so that each course comes after all of its prerequisites and no
+semester goes over the credit cap. For an either-or group (``CSE1101 or
+CSE1102``) the plan needs one member: one already completed or already in
+the plan if there is one, else the member that adds the fewest courses. A greedy schedule comes first: each
+semester takes the available courses on the longest prerequisite chains
+until the cap is reached. If that is longer than the lower bound, a
+depth-first search over "courses done so far" bitsets looks for a shorter
+plan. It memoizes the states that cannot finish in the semesters left, and
+deepens one semester at a time with its own state budget per length. When
+the time limit runs out, the best plan so far is returned, with
+``optimal`` false. Prerequisites that are not in the catalog are assumed to
+be met and are listed as ``assumed``.
+
+Batch input lines are ``{"studentId": ..., "completed": [...]}`` with an
+optional ``"required"`` list; each gets its own plan in a worker process.
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog.graph import PrereqIndexBuilder, normalize_code, set_bits
+from catalog.record import CourseRecord, HEADERS
+from catalog.writers import credit_hour_value
+
+
+class PlanError(Exception):
+    """No plan exists within the requested semesters, or the search gave up."""
+
+
+class _OutOfBudget(Exception):
+    """One search length used up its states, or the time limit passed."""
+
+
+class SemesterPlanner:
+    """Credit hours and prerequisite bitsets for one catalog."""
+
+    def __init__(self, index, credits):
+        self.codes = index.codes
+        self.position = index.position
+        self.credits = list(credits)
+        self.dangling = index.dangling
+        self.ancestors = index.ancestors
+        self.requires = [sum(1 << prereq for prereq in prereqs) for prereqs in index.prereqs]
+        # Per course, each either-or group as (catalog member bits, outside codes)
+        self.groups = []
+        for code in self.codes:
+            groups = []
+            for group in index.alternatives.get(code, ()):
+                members = sum(1 << self.position[ref] for ref in group if ref in self.position)
+                groups.append((members, [ref for ref in group if ref not in self.position]))
+            self.groups.append(groups)
+        self.cyclic = 0
+        for cycle in index.cycles:
+            for code in cycle:
+                self.cyclic |= 1 << self.position[code]
+
+    @classmethod
+    def from_csv(cls, path):
+        """Build a planner from a courses.csv written by data2csv.py."""
+        builder = PrereqIndexBuilder()
+        credits = {}
+        with open(path, newline='', encoding='utf-8') as handle:
+            reader = csv.reader(handle)
+            if next(reader, None) != HEADERS:
+                raise ValueError(f"{path} is not a courses.csv file")
+            for row in reader:
+                record = CourseRecord(*row)
+                builder.add(record)
+                credits[normalize_code(record.course_code)] = credit_hour_value(record.credit_hour)
+        index = builder.build()
+        return cls(index, [credits[code] for code in index.codes])
+
+    def _mask(self, codes, what):
+        mask = 0
+        for code in codes:
+            course = self.position.get(normalize_code(code))
+            if course is None:
+                raise PlanError(f"{what} course {code} is not in the catalog")
+            mask |= 1 << course
+        return mask
+
+    def plan(self, required=None, completed=(), cap=18, semesters=8, max_states=20_000,
+             time_limit=0.5):
+        """The shortest plan found for ``required`` (default: every course), as a dict.
+
+        Courses in ``completed`` are already done. Each plan length gets
+        ``max_states`` search states, and the whole search ``time_limit``
+        seconds. ``optimal`` in the result says whether no shorter plan can
+        exist. Raises ``PlanError`` if no plan fits in ``semesters``.
+        """
+        done = 0
+        for code in completed:
+            course = self.position.get(normalize_code(code))
+            if course is not None:
+                done |= 1 << course
+        if required is None:
+            wanted = (1 << len(self.codes)) - 1
+        else:
+            wanted = self._mask(required, 'Required')
+        target = wanted
+        for course in set_bits(wanted):
+            target |= self.ancestors[course]
+        target &= ~done
+        completed_codes = {normalize_code(code) for code in completed}
+        target, requires, assumed = self._choose_alternatives(target, done, completed_codes)
+
+        blocked = target & self.cyclic
+        if blocked:
+            raise PlanError("Prerequisite cycle: "
+                            + ', '.join(self.codes[i] for i in set_bits(blocked)))
+        too_big = [self.codes[i] for i in set_bits(target) if self.credits[i] > cap]
+        if too_big:
+            raise PlanError(f"Over the {cap:g} credit cap on their own: {', '.join(too_big)}")
+
+        search = _Search(self, target, requires, cap, max_states,
+                         time.monotonic() + time_limit)
+        lower = search.lower_bound(done)
+        if lower > semesters:
+            raise PlanError(f"Needs at least {lower} semesters, {semesters} allowed")
+        chosen = search.greedy(done)
+        optimal = len(chosen) <= lower
+        # Lengths below this one are proven impossible
+        proven = lower
+        for length in range(lower, min(len(chosen), semesters + 1)):
+            search.states = 0
+            try:
+                found = search.run(done, length)
+            except _OutOfBudget:
+                if time.monotonic() >= search.deadline:
+                    break
+                continue
+            if found is not None:
+                chosen = found
+                optimal = proven == length
+                break
+            if proven == length:
+                proven += 1
+        else:
+            optimal = optimal or proven >= len(chosen)
+        if len(chosen) > semesters:
+            raise PlanError(f"No plan found within {semesters} semesters")
+
+        assumed.update(code for course in set_bits(target)
+                       for code in self.dangling.get(self.codes[course], ()))
+        assumed = sorted(assumed - completed_codes)
+        plan = [[self.codes[i] for i in set_bits(mask)] for mask in chosen]
+        return {
+            'semesters': plan,
+            'credits': [sum(self.credits[i] for i in set_bits(mask)) for mask in chosen],
+            'assumed': assumed,
+            'optimal': optimal,
+        }
+
+
+    def _choose_alternatives(self, target, done, completed_codes):
+        """Meet each either-or group in ``target`` with one member.
+
+        Returns the target grown by any members picked (and their
+        prerequisites), per-course prerequisite bitsets that include the
+        picked members, and the outside codes assumed to be met.
+        """
+        requires = list(self.requires)
+        assumed = set()
+        pending = set_bits(target)
+        while pending:
+            course = pending.pop()
+            for members, outside in self.groups[course]:
+                if members & done or completed_codes.intersection(outside):
+                    continue
+                # A member that itself requires this course cannot come first
+                usable = [m for m in set_bits(members) if not self.ancestors[m] >> course & 1]
+                planned = [m for m in usable if target >> m & 1]
+                if planned:
+                    member = planned[0]
+                elif outside:
+                    # Like other prerequisites outside the catalog
+                    assumed.add(outside[0])
+                    continue
+                elif usable:
+                    member = min(usable, key=lambda m: (
+                        bin(self.ancestors[m] & ~done & ~target).count('1'),
+                        self.credits[m], m))
+                    added = ((1 << member) | self.ancestors[member]) & ~done & ~target
+                    target |= added
+                    pending.extend(set_bits(added))
+                else:
+                    raise PlanError(f"Every alternative for {self.codes[course]} "
+                                    f"requires it first")
+                requires[course] |= 1 << member
+        return target, requires, assumed
+
+
+class _Search:
+    """One memoized plan search; ``failed`` maps a state to the most semesters it failed with."""
+
+    def __init__(self, planner, target, requires, cap, max_states, deadline):
+        self.requires = requires
+        self.credits = planner.credits
+        self.target = target
+        self.cap = cap
+        self.max_states = max_states
+        self.deadline = deadline
+        self.states = 0
+        self.failed = {}
+        courses = set_bits(target)
+        dependents = {course: [] for course in courses}
+        for course in courses:
+            for prereq in set_bits(requires[course] & target):
+                dependents[prereq].append(course)
+        # Semesters needed from a course to the end of its longest chain in the
+        # target, working back from the courses nothing depends on
+        self.height = {}
+        waiting = {course: len(dependents[course]) for course in courses}
+        ready = [course for course in courses if not waiting[course]]
+        while ready:
+            course = ready.pop()
+            self.height[course] = 1 + max((self.height[d] for d in dependents[course]),
+                                          default=0)
+            for prereq in set_bits(requires[course] & target):
+                waiting[prereq] -= 1
+                if not waiting[prereq]:
+                    ready.append(prereq)
+        if len(self.height) < len(courses):
+            raise PlanError("Prerequisite cycle through either-or choices: "
+                            + ', '.join(planner.codes[c] for c in courses
+                                        if c not in self.height))
+        # Longest chains first, then heavier courses, so the first fill is the greedy one
+        self.priority = sorted(courses, key=lambda c: (-self.height[c], -self.credits[c], c))
+
+    def lower_bound(self, done):
+        remaining = [c for c in self.priority if not done >> c & 1]
+        if not remaining:
+            return 0
+        load = math.ceil(sum(self.credits[c] for c in remaining) / self.cap - 1e-9)
+        return max(load, self.height[remaining[0]])
+
+    def _available(self, done):
+        return [c for c in self.priority
+                if not done >> c & 1 and self.requires[c] & ~done & self.target == 0]
+
+    def greedy(self, done):
+        """The plan that always takes the first (priority-greedy) fill."""
+        plan = []
+        while self.target & ~done:
+            chosen = next(self._fills(self._available(done)), 0)
+            plan.append(chosen)
+            done |= chosen
+        return plan
+
+    def run(self, done, left):
+        """Semester masks finishing the target from ``done`` in ``left`` semesters, or None.
+
+        Raises ``_OutOfBudget`` past ``max_states`` states or the deadline.
+        """
+        if self.target & ~done == 0:
+            return []
+        if left == 0 or self.failed.get(done, -1) >= left:
+            return None
+        self.states += 1
+        if self.states > self.max_states or time.monotonic() >= self.deadline:
+            raise _OutOfBudget()
+        if self.lower_bound(done) <= left:
+            for chosen in self._fills(self._available(done)):
+                rest = self.run(done | chosen, left - 1)
+                if rest is not None:
+                    return [chosen] + rest
+        self.failed[done] = left
+        return None
+
+    def _fills(self, available):
+        """Maximal sets of ``available`` courses within the cap, best first.
+
+        Taking a course earlier never makes a later semester harder, so sets
+        that leave room for a skipped course are not worth trying. Branches
+        that can no longer fill that room are cut as soon as they start.
+        """
+        credits = self.credits
+        # Credits of available[i:], the most a branch at i can still add
+        suffix = [0] * (len(available) + 1)
+        for i in range(len(available) - 1, -1, -1):
+            suffix[i] = suffix[i + 1] + credits[available[i]]
+
+        def fills(start, room, chosen, smallest_skipped):
+            if room - suffix[start] >= smallest_skipped:
+                return
+            if start == len(available):
+                if chosen:
+                    yield chosen
+                return
+            course = available[start]
+            if credits[course] <= room:
+                yield from fills(start + 1, room - credits[course], chosen | 1 << course,
+                                 smallest_skipped)
+            yield from fills(start + 1, room, chosen, min(smallest_skipped, credits[course]))
+
+        return fills(0, self.cap, 0, math.inf)
+
+
+def _batch_plan(planner, student, cap, semesters, time_limit):
+    try:
+        plan = planner.plan(student.get('required'), student.get('completed', ()),
+                            cap, semesters, time_limit=time_limit)
+    except PlanError as exc:
+        return {'studentId': student.get('studentId'), 'error': str(exc)}
+    return {'studentId': student.get('studentId'), **plan}
+
+
+_worker_planner = None
+
+
+def _init_worker(path):
+    global _worker_planner
+    _worker_planner = SemesterPlanner.from_csv(path)
+
+
+def _worker_plan(student, cap, semesters, time_limit):
+    return _batch_plan(_worker_planner, student, cap, semesters, time_limit)
+
+
+def plan_batch(catalog, students, cap=18, semesters=8, workers=None, time_limit=0.5):
+    """Yield a plan (or ``error``) per student dict, in input order, using ``workers`` processes."""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(catalog,)) as pool:
+        pending = []
+        for student in students:
+            pending.append(pool.submit(_worker_plan, student, cap, semesters, time_limit))
+            if len(pending) >= 256:
+                yield from (future.result() for future in pending)
+                pending = []
+        yield from (future.result() for future in pending)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan semesters from courses.csv.")
+    parser.add_argument('catalog', nargs='?', default='courses.csv',
+                        help="courses.csv from data2csv.py. Default: courses.csv")
+    parser.add_argument('--require', nargs='+', metavar='CODE',
+                        help="Courses the plan must include. Default: the whole catalog")
+    parser.add_argument('--completed', nargs='+', metavar='CODE', default=[],
+                        help="Courses already taken")
+    parser.add_argument('--cap', type=float, default=18,
+                        help="Credit hours allowed per semester. Default: 18")
+    parser.add_argument('--semesters', type=int, default=8,
+                        help="Most semesters a plan may use. Default: 8")
+    parser.add_argument('--time-limit', type=float, default=0.5, metavar='SECONDS',
+                        help="Search time per plan before the best plan so far is "
+                             "returned. Default: 0.5")
+    parser.add_argument('--batch', metavar='NDJSON',
+                        help="Plan for every {studentId, completed, required} line")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for --batch. Default: one per CPU")
+    parser.add_argument('-o', '--output', default='-', help="Output path. Default: stdout")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        if args.batch:
+            with open(args.batch, encoding='utf-8') as handle:
+                students = (json.loads(line) for line in handle if line.strip())
+                for result in plan_batch(args.catalog, students, args.cap,
+                                         args.semesters, args.workers, args.time_limit):
+                    out.write(json.dumps(result) + '\n')
+            return 0
+
+        planner = SemesterPlanner.from_csv(args.catalog)
+        try:
+            plan = planner.plan(args.require, args.completed, args.cap, args.semesters,
+                                time_limit=args.time_limit)
+        except PlanError as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+        for number, (codes, credits) in enumerate(zip(plan['semesters'], plan['credits']), 1):
+            print(f"Semester {number} ({credits:g} credits): {', '.join(codes)}", file=out)
+        if not plan['optimal']:
+            print("The search timed out; a shorter plan may exist.", file=out)
+        if plan['assumed']:
+            print(f"Assumed already met: {', '.join(plan['assumed'])}", file=out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
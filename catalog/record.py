@@ -0,0 +1,83 @@
+"""Compact per-course record produced by the parser.
+
+Everything keyed by course code follows one rule: a code seen twice keeps
+its last row, as the admin import's upsert does. That covers the indexes
+built from a record stream, the SQLite sink and the catalog diff.
+"""
+
+HEADERS = ['Course Code', 'Course Title', 'Credit Hour', 'Prerequisite', 'Content']
+
+# Attribute for each CSV header, in the same order
+FIELDS = ('course_code', 'course_title', 'credit_hour', 'prerequisite', 'content')
+
+
+class CourseRecord:
+    """One course, stored in slots rather than a per-instance dict."""
+
+    __slots__ = FIELDS
+
+    # Only TextbookRecord stores Textbook text; plain records have none
+    textbook = ''
+
+    def __init__(self, course_code='', course_title='', credit_hour='',
+                 prerequisite='', content=''):
+        self.course_code = course_code
+        self.course_title = course_title
+        self.credit_hour = credit_hour
+        self.prerequisite = prerequisite
+        self.content = content
+
+    def as_row(self):
+        """Field values in ``HEADERS`` order, ready for ``csv.writer``."""
+        return [self.course_code, self.course_title, self.credit_hour,
+                self.prerequisite, self.content]
+
+    def __eq__(self, other):
+        if not isinstance(other, CourseRecord):
+            return NotImplemented
+        return self.as_row() == other.as_row()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.course_code!r}, {self.course_title!r})"
+
+
+class TextbookRecord(CourseRecord):
+    """A ``CourseRecord`` that also keeps the raw Textbook text.
+
+    The parser only builds these when asked to, since the text is not a
+    courses.csv column. ``as_row`` and equality leave it out.
+    """
+
+    __slots__ = ('textbook',)
+
+    def __init__(self, course_code='', course_title='', credit_hour='',
+                 prerequisite='', content='', textbook=''):
+        super().__init__(course_code, course_title, credit_hour, prerequisite, content)
+        self.textbook = textbook
+
+
+class RecordObserver:
+    """Base for builders that collect courses while the records stream past.
+
+    Subclasses define ``add(record)``; ``observe`` wraps a record stream so
+    that each record is added on its way to the sink.
+    """
+
+    def observe(self, records):
+        """Pass ``records`` through unchanged, adding each one on the way."""
+        for record in records:
+            self.add(record)
+            yield record
+
+
+def record_row(record):
+    """``as_row()`` plus the Textbook text for a ``TextbookRecord``, for pickling or spilling."""
+    row = record.as_row()
+    if isinstance(record, TextbookRecord):
+        row.append(record.textbook)
+    return row
+
+
+def record_class(textbooks):
+    """The record type the parser builds with or without Textbook text."""
+    return TextbookRecord if textbooks else CourseRecord
@@ -0,0 +1,124 @@
+"""Memory-mapped record scanner for large catalog dumps.
+
+Record boundaries are found by searching the raw bytes for the
+``Course Code:`` marker, and only the bytes of a record that is actually
+kept are ever decoded. Each span is then handed to ``parse_records``, so the
+output matches the line-based parser exactly.
+"""
+
+import codecs
+import mmap
+
+from catalog.parser import decode_error, iter_lines, parse_records
+
+MARKER = b'Course Code:'
+
+
+def _line_start(buf, pos):
+    """Offset of the first byte of the line containing ``pos``."""
+    newline = buf.rfind(b'\n', 0, pos)
+    # Only look for a lone \r after the last \n, or every call rescans the file
+    return max(newline, buf.rfind(b'\r', newline + 1, pos)) + 1
+
+
+def _record_starts(buf, offset=0):
+    """Yield ``(line_start, marker_pos)`` for every ``Course Code:`` line.
+
+    A marker only opens a record when nothing but whitespace precedes it on
+    its line, which is what ``tokenize`` sees after ``strip()``. Searching
+    begins at ``offset``.
+    """
+    pos = buf.find(MARKER, offset)
+    while pos != -1:
+        start = _line_start(buf, pos)
+        if start == 0 and buf[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            # A byte order mark is not part of the first line
+            start = len(codecs.BOM_UTF8)
+        indent = buf[start:pos]
+        # Non-ASCII indentation (e.g. a no-break space) needs a decode to judge
+        if not indent.strip() or not indent.decode('utf-8').strip():
+            yield start, pos
+        pos = buf.find(MARKER, pos + len(MARKER))
+
+
+def _span_lines(text):
+    """Split decoded text the way a text-mode file iterates it."""
+    return text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+
+
+def scan_buffer(buf, code_prefix='', textbooks=False):
+    """Yield one ``CourseRecord`` per record in the bytes-like ``buf``.
+
+    When ``code_prefix`` is set, records whose course code does not start
+    with it are skipped by comparing raw bytes, without decoding the span.
+    Bytes before the first marker belong to no course and are ignored.
+    ``textbooks`` is passed on to ``parse_records``.
+    """
+    prefix = code_prefix.encode('utf-8')
+    starts = _record_starts(buf)
+    current = next(starts, None)
+    while current is not None:
+        start, marker = current
+        following = next(starts, None)
+        end = following[0] if following is not None else len(buf)
+
+        if prefix:
+            code_at = marker + len(MARKER)
+            eol = buf.find(b'\n', code_at, end)
+            code = buf[code_at:end if eol == -1 else eol].strip()
+            if not code.startswith(prefix):
+                current = following
+                continue
+
+        yield from parse_records(_span_lines(buf[start:end].decode('utf-8')), textbooks)
+        current = following
+
+
+def chunk_bounds(buf, chunk_bytes):
+    """Split ``buf`` into ``(start, end)`` spans of roughly ``chunk_bytes``.
+
+    Every span after the first begins on a record's ``Course Code:`` line, so
+    scanning the spans one after another yields the same records as scanning
+    the whole buffer.
+    """
+    bounds = []
+    start = 0
+    while start < len(buf):
+        end = len(buf)
+        for line_start, _ in _record_starts(buf, start + chunk_bytes):
+            # A marker's line can begin before the search offset
+            if line_start > start:
+                end = line_start
+                break
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def scan_file(path, code_prefix='', textbooks=False):
+    """Scan one catalog file through a read-only memory map."""
+    with open(path, 'rb') as handle:
+        try:
+            buf = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped and hold no records anyway
+            return
+        with buf:
+            try:
+                yield from scan_buffer(buf, code_prefix, textbooks)
+            except UnicodeDecodeError as exc:
+                raise decode_error(path, exc) from None
+
+
+def scan_records(paths, code_prefix='', textbooks=False):
+    """Scan each path in turn; ``-`` falls back to line-based stdin parsing.
+
+    Unlike ``parse_records(iter_lines(paths))``, files are scanned
+    independently, so a record never continues from one file into the next.
+    """
+    for path in paths:
+        if path == '-':
+            records = parse_records(iter_lines(['-']), textbooks)
+            yield from (r for r in records if r.course_code.startswith(code_prefix))
+        else:
+            yield from scan_file(path, code_prefix, textbooks)
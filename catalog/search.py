@@ -0,0 +1,347 @@
+"""Full-text search over course titles and Content.
+
+``SearchIndexBuilder`` tokenizes each course's title and Content once while
+data2csv.py converts the catalog (``--search-index PATH``) and writes a
+single binary file. ``SearchIndex.open`` memory-maps that file and reads the
+posting arrays in place, so opening it costs no parsing. Queries are ranked
+with BM25 and support:
+
+* plain terms: ``graphs sorting``
+* phrases: ``"binary search trees"``
+* prefixes: ``algo*``
+
+Matching is OR: a course scores for every term, phrase or prefix it
+contains. Title tokens come first, followed by the Content tokens after a
+one-position gap so that a phrase never spans the two.
+
+File layout: a fixed header, then sections of native little-endian uint32
+arrays and UTF-8 blobs. Terms are sorted so lookups and prefix ranges are
+binary searches. Each posting holds a document id, a term frequency and the
+byte offset of its positions, which are delta-encoded varints.
+"""
+
+import heapq
+import math
+import mmap
+import re
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+from catalog.record import RecordObserver
+
+MAGIC = b'CATSRCH1'
+# magic, documents, terms, postings, average document length
+_HEADER = struct.Struct('<8sIIId')
+SECTIONS = ('doc_len', 'doc_offsets', 'doc_blob', 'term_offsets', 'term_blob',
+            'term_start', 'post_docs', 'post_tfs', 'pos_offsets', 'positions')
+_TABLE = struct.Struct('<' + 'QQ' * len(SECTIONS))
+
+K1 = 1.2
+B = 0.75
+
+_WORD = re.compile(r'[a-z0-9]+')
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize_text(text):
+    """Lowercased alphanumeric runs: ``"Data-Structures I"`` -> ``['data', 'structures', 'i']``."""
+    return _WORD.findall(text.lower())
+
+
+def _write_varints(out, values):
+    """Append ``values`` to ``out`` as deltas, seven bits per byte."""
+    previous = 0
+    for value in values:
+        delta = value - previous
+        previous = value
+        while delta >= 0x80:
+            out.append(delta & 0x7F | 0x80)
+            delta >>= 7
+        out.append(delta)
+
+
+def _read_varints(buf, start, end):
+    chunk = bytes(buf[start:end])
+    if not chunk or max(chunk) < 0x80:
+        # Every delta fits in one byte, the usual case for positions
+        return list(accumulate(chunk))
+    values = []
+    value = shift = previous = 0
+    for byte in chunk:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += value
+        values.append(previous)
+        value = shift = 0
+    return values
+
+
+class SearchIndexBuilder(RecordObserver):
+    """Collects title and Content tokens from a record stream."""
+
+    def __init__(self):
+        self.docs = []          # (code, title) per document id
+        self.lengths = array('I')
+        self.live = []
+        self.by_code = {}
+        # term -> [document ids, term frequencies, position offsets, positions]
+        self.postings = {}
+
+    def add(self, record):
+        code = record.course_code.strip()
+        if not code:
+            return
+        doc = len(self.docs)
+        previous = self.by_code.get(code)
+        if previous is not None:
+            self.live[previous] = False
+        self.by_code[code] = doc
+        title = record.course_title.strip()
+        self.docs.append((code, title))
+        self.live.append(True)
+
+        title_tokens = tokenize_text(title)
+        places = {}
+        for position, term in enumerate(title_tokens):
+            places.setdefault(term, []).append(position)
+        content_tokens = tokenize_text(record.content)
+        for position, term in enumerate(content_tokens, len(title_tokens) + 1):
+            places.setdefault(term, []).append(position)
+        self.lengths.append(len(title_tokens) + len(content_tokens))
+
+        for term, positions in places.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = [array('I'), array('I'), array('I'), bytearray()]
+            entry[0].append(doc)
+            entry[1].append(len(positions))
+            entry[2].append(len(entry[3]))
+            _write_varints(entry[3], positions)
+
+    def save(self, path):
+        """Write the index to ``path``; returns ``(documents, terms)``."""
+        renumber = {}
+        doc_len = array('I')
+        doc_offsets = array('I', [0])
+        doc_blob = bytearray()
+        for doc, live in enumerate(self.live):
+            if live:
+                renumber[doc] = len(renumber)
+                code, title = self.docs[doc]
+                doc_blob += f"{code}\t{title}".encode('utf-8')
+                doc_offsets.append(len(doc_blob))
+                doc_len.append(self.lengths[doc])
+
+        term_offsets = array('I', [0])
+        term_blob = bytearray()
+        term_start = array('I', [0])
+        post_docs = array('I')
+        post_tfs = array('I')
+        pos_offsets = array('I')
+        positions = bytearray()
+        for term in sorted(self.postings):
+            docs, tfs, offsets, blob = self.postings[term]
+            ends = list(offsets[1:]) + [len(blob)]
+            kept = 0
+            for doc, tf, start, end in zip(docs, tfs, offsets, ends):
+                if doc in renumber:
+                    post_docs.append(renumber[doc])
+                    post_tfs.append(tf)
+                    pos_offsets.append(len(positions))
+                    positions += blob[start:end]
+                    kept += 1
+            if kept:
+                term_blob += term.encode('utf-8')
+                term_offsets.append(len(term_blob))
+                term_start.append(len(post_docs))
+        pos_offsets.append(len(positions))
+
+        documents = len(doc_len)
+        terms = len(term_offsets) - 1
+        average = sum(doc_len) / documents if documents else 0.0
+        sections = [_le_bytes(section) for section in
+                    (doc_len, doc_offsets, doc_blob, term_offsets, term_blob,
+                     term_start, post_docs, post_tfs, pos_offsets, positions)]
+        table = []
+        offset = _HEADER.size + _TABLE.size
+        for data in sections:
+            # Keep every section 8-byte aligned for the uint32 views
+            offset += -offset % 8
+            table += [offset, len(data)]
+            offset += len(data)
+        with open(path, 'wb') as handle:
+            handle.write(_HEADER.pack(MAGIC, documents, terms, len(post_docs), average))
+            handle.write(_TABLE.pack(*table))
+            for data, start in zip(sections, table[::2]):
+                handle.write(b'\0' * (start - handle.tell()))
+                handle.write(data)
+        return documents, terms
+
+
+def _le_bytes(section):
+    if isinstance(section, array) and sys.byteorder != 'little':
+        section = array(section.typecode, section)
+        section.byteswap()
+    return bytes(section)
+
+
+class SearchIndex:
+    """A saved search index, memory-mapped and queried in place."""
+
+    def __init__(self, buf):
+        self._buf = buf
+        magic, self.documents, self.terms, self.postings, self.average = \
+            _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("not a catalog search index")
+        table = _TABLE.unpack_from(buf, _HEADER.size)
+        view = self._view = memoryview(buf)
+        for name, start, size in zip(SECTIONS, table[::2], table[1::2]):
+            section = view[start:start + size]
+            if not name.endswith('blob') and name != 'positions':
+                section = _uint32(section)
+            setattr(self, name, section)
+        self._norms = None
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as handle:
+            return cls(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self):
+        for name in SECTIONS:
+            section = getattr(self, name)
+            if isinstance(section, memoryview):
+                section.release()
+        self._view.release()
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _term(self, i):
+        return bytes(self.term_blob[self.term_offsets[i]:self.term_offsets[i + 1]])
+
+    def _lower_bound(self, key):
+        lo, hi = 0, self.terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _lookup(self, term):
+        key = term.encode('utf-8')
+        i = self._lower_bound(key)
+        return i if i < self.terms and self._term(i) == key else None
+
+    def expand(self, prefix, limit=64):
+        """Up to ``limit`` indexed terms starting with ``prefix``, most frequent first."""
+        key = prefix.encode('utf-8')
+        lo = self._lower_bound(key)
+        hi = self._lower_bound(key + b'\xff')
+        start = self.term_start
+        found = sorted(range(lo, hi), key=lambda i: start[i] - start[i + 1])[:limit]
+        return [self._term(i).decode('utf-8') for i in found]
+
+    def document(self, doc):
+        """``(code, title)`` for a document id."""
+        text = bytes(self.doc_blob[self.doc_offsets[doc]:self.doc_offsets[doc + 1]])
+        code, _, title = text.decode('utf-8').partition('\t')
+        return code, title
+
+    def _idf(self, df):
+        return math.log(1 + (self.documents - df + 0.5) / (df + 0.5))
+
+    def _doc_norms(self):
+        if self._norms is None:
+            average = self.average or 1.0
+            self._norms = [K1 * (1 - B + B * length / average) for length in self.doc_len]
+        return self._norms
+
+    def _score_term(self, term, scores):
+        i = self._lookup(term)
+        if i is None:
+            return
+        start, end = self.term_start[i], self.term_start[i + 1]
+        idf = self._idf(end - start)
+        norms = self._doc_norms()
+        weight = idf * (K1 + 1)
+        get = scores.get
+        for doc, tf in zip(self.post_docs[start:end], self.post_tfs[start:end]):
+            scores[doc] = get(doc, 0.0) + weight * tf / (tf + norms[doc])
+
+    def _positions(self, posting):
+        return _read_varints(self.positions, self.pos_offsets[posting],
+                             self.pos_offsets[posting + 1])
+
+    def _score_phrase(self, terms, scores):
+        ranges = []
+        for term in terms:
+            i = self._lookup(term)
+            if i is None:
+                return
+            ranges.append((self.term_start[i], self.term_start[i + 1]))
+        idf = sum(self._idf(end - start) for start, end in ranges)
+        norms = self._doc_norms()
+        docs = self.post_docs
+        # Documents holding every term, then each term's posting in them
+        common = set(docs[ranges[0][0]:ranges[0][1]])
+        for start, end in ranges[1:]:
+            common.intersection_update(docs[start:end])
+        if not common:
+            return
+        postings = [{doc: posting for posting, doc in zip(range(start, end), docs[start:end])
+                     if doc in common} for start, end in ranges]
+        for doc in common:
+            starts = set(self._positions(postings[0][doc]))
+            for offset, term_postings in enumerate(postings[1:], 1):
+                starts.intersection_update(
+                    [place - offset for place in self._positions(term_postings[doc])])
+                if not starts:
+                    break
+            tf = len(starts)
+            if tf:
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / (tf + norms[doc])
+
+    def search(self, query, limit=10):
+        """Top ``limit`` ``(code, title, score)`` matches for ``query``, best first."""
+        scores = {}
+        for phrase, word in _QUERY.findall(query):
+            if phrase:
+                terms = tokenize_text(phrase)
+                if len(terms) > 1:
+                    self._score_phrase(terms, scores)
+                elif terms:
+                    self._score_term(terms[0], scores)
+                continue
+            if word.endswith('*'):
+                for prefix in tokenize_text(word)[-1:]:
+                    for term in self.expand(prefix):
+                        self._score_term(term, scores)
+                for term in tokenize_text(word)[:-1]:
+                    self._score_term(term, scores)
+                continue
+            for term in tokenize_text(word):
+                self._score_term(term, scores)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [self.document(doc) + (score,) for doc, score in best]
+
+
+def _uint32(view):
+    if sys.byteorder == 'little':
+        return view.cast('I')
+    values = array('I')
+    values.frombytes(view)
+    values.byteswap()
+    return values
@@ -0,0 +1,309 @@
+"""TF-IDF "similar courses" neighbors over the Content text.
+
+    python -m catalog.similar courses.csv --cache neighbors.npz --course CSE3201
+    python -m catalog.similar cse.csv eee.csv --cache neighbors.npz --overlap
+
+Each course's title and Content are tokenized (as for the search index) and
+weighted with sublinear TF-IDF. The rows are L2-normalized, so a dot product
+is the cosine similarity. The top-k neighbors of every course are found by
+multiplying one block of rows at a time against the whole matrix. Each block
+is sized so that its dense score matrix stays within ``max_block_bytes``,
+which bounds memory however many courses there are.
+
+A catalog whose term matrix is small enough is multiplied densely. A larger
+one uses SciPy sparse matrices when SciPy is installed, and otherwise dense
+column slices are built one block at a time with NumPy. The neighbor table is saved as
+``.npz`` along with a digest of its input and settings, so a later run over
+the same catalog loads it instead of recomputing it.
+"""
+
+import argparse
+import csv
+import hashlib
+import sys
+from collections import Counter
+
+from catalog.record import HEADERS
+from catalog.search import tokenize_text
+
+try:
+    import numpy as np
+except ImportError:  # optional: only needed for the similarity tables
+    np = None
+
+try:
+    from scipy import sparse
+except ImportError:  # optional: NumPy alone works, densifying per block
+    sparse = None
+
+# Budget for one block's dense course x course scores
+MAX_BLOCK_BYTES = 64 * 1024 * 1024
+
+# Largest dense slice of the term matrix built at once
+_DENSE_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("course similarity needs numpy: pip install numpy")
+
+
+class TfidfMatrix:
+    """L2-normalized sublinear TF-IDF rows in CSR arrays."""
+
+    def __init__(self, texts):
+        _require_numpy()
+        vocabulary = {}
+        indptr = [0]
+        indices = []
+        counts = []
+        for text in texts:
+            terms = Counter(tokenize_text(text))
+            for term, count in terms.items():
+                indices.append(vocabulary.setdefault(term, len(vocabulary)))
+                counts.append(count)
+            indptr.append(len(indices))
+        self.rows = len(indptr) - 1
+        self.columns = len(vocabulary)
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int32)
+
+        df = np.bincount(self.indices, minlength=self.columns)
+        idf = np.log((1 + self.rows) / (1 + df)) + 1
+        data = (1 + np.log(np.array(counts, dtype=np.float32))) * idf[self.indices]
+        lengths = np.diff(self.indptr)
+        row_of = np.repeat(np.arange(self.rows), lengths)
+        norms = np.sqrt(np.bincount(row_of, weights=data * data, minlength=self.rows))
+        data /= norms[row_of]
+        self.data = data.astype(np.float32)
+
+    def dense(self, start, end, first=0, last=None):
+        """Rows ``start:end``, columns ``first:last``, as a dense array."""
+        last = self.columns if last is None else last
+        out = np.zeros((end - start, last - first), dtype=np.float32)
+        lo, hi = self.indptr[start], self.indptr[end]
+        rows = np.repeat(np.arange(end - start), np.diff(self.indptr[start:end + 1]))
+        columns = self.indices[lo:hi]
+        keep = (columns >= first) & (columns < last)
+        out[rows[keep], columns[keep] - first] = self.data[lo:hi][keep]
+        return out
+
+    def csr(self):
+        return sparse.csr_matrix((self.data, self.indices, self.indptr),
+                                 shape=(self.rows, self.columns))
+
+
+def _block_scores_dense(tfidf, start, end):
+    """Scores for rows ``start:end`` against every row, densifying column ranges."""
+    scores = np.zeros((end - start, tfidf.rows), dtype=np.float32)
+    width = max(1, _DENSE_CHUNK_BYTES // (4 * max(tfidf.rows, end - start)))
+    for first in range(0, tfidf.columns, width):
+        last = min(first + width, tfidf.columns)
+        block = tfidf.dense(start, end, first, last)
+        if not block.any():
+            continue
+        scores += block @ tfidf.dense(0, tfidf.rows, first, last).T
+    return scores
+
+
+def _scorer(tfidf):
+    """A function giving the dense scores of a block of rows against all rows.
+
+    A small vocabulary fits as one dense matrix and goes through BLAS. A
+    large one stays sparse when SciPy is available.
+    """
+    if tfidf.rows * tfidf.columns * 4 <= _DENSE_CHUNK_BYTES:
+        dense = tfidf.dense(0, tfidf.rows)
+        return lambda start, end: dense[start:end] @ dense.T
+    if sparse is not None:
+        matrix = tfidf.csr()
+        transposed = matrix.T.tocsc()
+        return lambda start, end: (matrix[start:end] @ transposed).toarray()
+    return lambda start, end: _block_scores_dense(tfidf, start, end)
+
+
+def top_neighbors(tfidf, k=10, max_block_bytes=MAX_BLOCK_BYTES):
+    """``(neighbors, scores)``: the ``k`` most similar other rows of each row.
+
+    Rows with fewer than ``k`` positive scores are padded with -1 / 0.
+    """
+    count = tfidf.rows
+    k = min(k, max(count - 1, 0))
+    neighbors = np.full((count, k), -1, dtype=np.int32)
+    similarity = np.zeros((count, k), dtype=np.float32)
+    if not k:
+        return neighbors, similarity
+    block = max(1, min(count, max_block_bytes // (4 * count)))
+    block_scores = _scorer(tfidf)
+    for start in range(0, count, block):
+        end = min(start + block, count)
+        scores = block_scores(start, end)
+        rows = np.arange(end - start)
+        scores[rows, rows + start] = -1.0
+        best = np.argpartition(scores, -k, axis=1)[:, -k:]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        positive = best_scores > 0
+        neighbors[start:end] = np.where(positive, best, -1)
+        similarity[start:end] = np.where(positive, best_scores, 0.0)
+    return neighbors, similarity
+
+
+def catalog_digest(courses, k):
+    """Digest of the ``(code, title, content, group)`` input and ``k``."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"k={k}".encode('utf-8'))
+    for course in courses:
+        digest.update('\x1e'.join(course).encode('utf-8') + b'\x1f')
+    return digest.hexdigest()
+
+
+class NeighborTable:
+    """Top-k similar courses for every course, optionally tagged by catalog.
+
+    Rows are identified by ``(group, code)``: two catalogs often share codes.
+    """
+
+    def __init__(self, codes, groups, neighbors, scores, digest=''):
+        self.codes = list(codes)
+        self.groups = list(groups)
+        self.neighbors = neighbors
+        self.scores = scores
+        self.digest = digest
+        self.position = {(group, code): i
+                         for i, (group, code) in enumerate(zip(self.groups, self.codes))}
+
+    @classmethod
+    def build(cls, courses, k=10, max_block_bytes=MAX_BLOCK_BYTES):
+        """``courses`` are ``(code, title, content, group)`` tuples."""
+        _require_numpy()
+        tfidf = TfidfMatrix(f"{title} {content}" for _, title, content, _ in courses)
+        neighbors, scores = top_neighbors(tfidf, k, max_block_bytes)
+        return cls([course[0] for course in courses], [course[3] for course in courses],
+                   neighbors, scores, catalog_digest(courses, k))
+
+    @classmethod
+    def cached(cls, courses, k=10, path=None, max_block_bytes=MAX_BLOCK_BYTES):
+        """Load ``path`` if it was built from the same input, else build and save it."""
+        _require_numpy()
+        digest = catalog_digest(courses, k)
+        if path:
+            try:
+                table = cls.load(path)
+            except (OSError, ValueError, KeyError):
+                table = None
+            if table is not None and table.digest == digest:
+                return table
+        table = cls.build(courses, k, max_block_bytes)
+        if path:
+            table.save(path)
+        return table
+
+    def save(self, path):
+        with open(path, 'wb') as handle:
+            np.savez(handle, codes=np.array(self.codes, dtype=str),
+                     groups=np.array(self.groups, dtype=str),
+                     neighbors=self.neighbors, scores=self.scores,
+                     digest=np.array(self.digest))
+
+    @classmethod
+    def load(cls, path):
+        _require_numpy()
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['codes'].tolist(), data['groups'].tolist(), data['neighbors'],
+                       data['scores'], str(data['digest']))
+
+    def groups_of(self, code):
+        """The groups that have a course ``code``, in row order."""
+        return [group for group, other in zip(self.groups, self.codes) if other == code]
+
+    def similar(self, code, group=None, limit=None):
+        """``(code, group, score)`` for the courses most similar to ``code``, best first.
+
+        ``group`` picks the catalog when more than one has ``code``.
+        """
+        if group is None:
+            groups = self.groups_of(code)
+            if len(groups) > 1:
+                raise KeyError(f"{code} is in {len(groups)} catalogs; pass one of "
+                               f"{', '.join(groups)}")
+            group = groups[0] if groups else None
+        row = self.position[(group, code)]
+        pairs = [(self.codes[n], self.groups[n], float(s))
+                 for n, s in zip(self.neighbors[row], self.scores[row]) if n >= 0]
+        return pairs[:limit]
+
+    def overlap(self, first, second, min_score=0.5):
+        """``(code in first, code in second, score)`` for near neighbors across groups."""
+        pairs = []
+        for row, group in enumerate(self.groups):
+            if group != first:
+                continue
+            for n, s in zip(self.neighbors[row], self.scores[row]):
+                if n >= 0 and s >= min_score and self.groups[n] == second:
+                    pairs.append((self.codes[row], self.codes[n], float(s)))
+        pairs.sort(key=lambda pair: -pair[2])
+        return pairs
+
+
+def read_courses(paths):
+    """``(code, title, content, path)`` per course in each courses.csv, last row per code."""
+    courses = {}
+    for path in paths:
+        with open(path, newline='', encoding='utf-8') as handle:
+            reader = csv.reader(handle)
+            if next(reader, None) != HEADERS:
+                raise ValueError(f"{path} is not a courses.csv file")
+            for row in reader:
+                if row and row[0].strip():
+                    courses[(path, row[0].strip())] = (row[0].strip(), row[1], row[4], path)
+    return list(courses.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Similar-course reports from courses.csv.")
+    parser.add_argument('catalogs', nargs='+', help="One or more courses.csv files")
+    parser.add_argument('--k', type=int, default=10,
+                        help="Neighbors kept per course. Default: 10")
+    parser.add_argument('--cache', metavar='PATH',
+                        help="Neighbor table .npz to reuse when the input is unchanged")
+    parser.add_argument('--course', action='append', default=[], metavar='CODE',
+                        help="Print the courses most similar to CODE")
+    parser.add_argument('--overlap', action='store_true',
+                        help="With two catalogs, print course pairs across them "
+                             "at or above --min-score")
+    parser.add_argument('--min-score', type=float, default=0.5,
+                        help="Cosine similarity threshold for --overlap. Default: 0.5")
+    parser.add_argument('--max-block-mb', type=float, default=MAX_BLOCK_BYTES / 2**20,
+                        help="Memory for one block of scores. Default: 64")
+    args = parser.parse_args(argv)
+    if args.overlap and len(args.catalogs) != 2:
+        parser.error("--overlap needs exactly two catalogs")
+
+    courses = read_courses(args.catalogs)
+    try:
+        table = NeighborTable.cached(courses, args.k, args.cache,
+                                     int(args.max_block_mb * 2**20))
+    except ImportError as exc:
+        parser.error(str(exc))
+    for code in args.course:
+        groups = table.groups_of(code)
+        if not groups:
+            print(f"Unknown course {code}", file=sys.stderr)
+        # A code shared by several catalogs gets a list for each of them
+        for group in groups:
+            print(f"{code} ({group}):")
+            for other, other_group, score in table.similar(code, group):
+                print(f"  {other:<12} {score:.3f}  {other_group}")
+    if args.overlap:
+        first, second = args.catalogs
+        print(f"{first:<24} {second:<24} score")
+        for a, b, score in table.overlap(first, second, args.min_score):
+            print(f"{a:<24} {b:<24} {score:.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
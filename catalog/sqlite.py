@@ -0,0 +1,149 @@
+"""SQLite output for local lookups and full-text search.
+
+The database has one ``courses`` table plus an FTS5 index over titles and
+Content::
+
+    courses(id, course_code, department, level, course_title,
+            credit_hour, prerequisite, content)
+    courses_fts(course_title, content)   -- external content on courses.id
+    textbooks(id, title, authors, edition)
+    course_textbooks(course_code, position, textbook_id)
+
+``department`` and ``level`` come from the normalized code (``CSE 2102`` ->
+``CSE``, 2). Rows are inserted with ``executemany`` in one transaction, in
+WAL mode. Indexes are built and the FTS table is filled only once the load
+has finished, which is much faster than keeping them up to date row by row.
+Repeated codes keep their last row (see ``catalog.record``). Each distinct
+textbook is stored once (see ``catalog.textbooks``) and linked to the
+courses that list it.
+"""
+
+import os
+import re
+import sqlite3
+from itertools import islice
+
+from catalog.graph import normalize_code
+from catalog.textbooks import TextbookTable
+from catalog.writers import credit_hour_value
+
+# Rows per executemany call
+BATCH_ROWS = 10_000
+
+_CODE_PARTS = re.compile(r'^([A-Za-z]+)\s*(\d)')
+
+SCHEMA = """
+CREATE TABLE courses (
+    id INTEGER PRIMARY KEY,
+    course_code TEXT NOT NULL,
+    department TEXT,
+    level INTEGER,
+    course_title TEXT,
+    credit_hour REAL,
+    prerequisite TEXT,
+    content TEXT
+)
+"""
+
+INDEXES = [
+    "CREATE UNIQUE INDEX courses_code ON courses (course_code)",
+    "CREATE INDEX courses_department_level ON courses (department, level)",
+    "CREATE INDEX courses_level ON courses (level)",
+]
+
+TEXTBOOK_SCHEMA = [
+    """CREATE TABLE textbooks (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        authors TEXT,
+        edition TEXT
+    )""",
+    """CREATE TABLE course_textbooks (
+        course_code TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        textbook_id INTEGER NOT NULL REFERENCES textbooks (id),
+        PRIMARY KEY (course_code, position)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX course_textbooks_textbook ON course_textbooks (textbook_id)",
+]
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE courses_fts USING fts5(
+    course_title, content, content='courses', content_rowid='id'
+)
+"""
+
+
+def _row(record):
+    code = normalize_code(record.course_code)
+    match = _CODE_PARTS.match(code)
+    department, level = (match.group(1).upper(), int(match.group(2))) if match else (None, None)
+    return (code, department, level, record.course_title.strip(),
+            credit_hour_value(record.credit_hour), record.prerequisite.strip() or 'N/A',
+            record.content.strip())
+
+
+class SqliteSink:
+    """Loads records into a fresh SQLite database at ``path``."""
+
+    def __init__(self, path, batch_rows=BATCH_ROWS):
+        for stale in (path, path + '-wal', path + '-shm'):
+            if os.path.exists(stale):
+                os.remove(stale)
+        self.path = path
+        self.batch_rows = batch_rows
+        self.rows = 0
+        self.fts = True
+        self.textbooks = TextbookTable()
+        # --batch calls write() from worker threads, one call at a time
+        self.connection = sqlite3.connect(path, isolation_level=None,
+                                          check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("BEGIN")
+        self.connection.execute(SCHEMA)
+
+    def write(self, records):
+        count = 0
+        rows = (self._row(record) for record in records if record.course_code)
+        insert = ("INSERT INTO courses (course_code, department, level, course_title, "
+                  "credit_hour, prerequisite, content) VALUES (?, ?, ?, ?, ?, ?, ?)")
+        while True:
+            batch = list(islice(rows, self.batch_rows))
+            if not batch:
+                break
+            self.connection.executemany(insert, batch)
+            count += len(batch)
+        self.rows += count
+        return count
+
+    def _row(self, record):
+        row = _row(record)
+        self.textbooks.link(row[0], record.textbook)
+        return row
+
+    def close(self):
+        """Drop superseded rows, build the indexes, textbook and FTS tables, and commit."""
+        connection = self.connection
+        try:
+            connection.execute("DELETE FROM courses WHERE id NOT IN "
+                               "(SELECT MAX(id) FROM courses GROUP BY course_code)")
+            for statement in INDEXES:
+                connection.execute(statement)
+            for statement in TEXTBOOK_SCHEMA:
+                connection.execute(statement)
+            connection.executemany("INSERT INTO textbooks VALUES (?, ?, ?, ?)",
+                                   self.textbooks.rows())
+            connection.executemany("INSERT INTO course_textbooks VALUES (?, ?, ?)",
+                                   self.textbooks.links())
+            try:
+                connection.execute(FTS_SCHEMA)
+            except sqlite3.OperationalError:
+                # This SQLite was built without FTS5; the lookups still work
+                self.fts = False
+            else:
+                connection.execute("INSERT INTO courses_fts (courses_fts) VALUES ('rebuild')")
+            connection.execute("COMMIT")
+            connection.execute("PRAGMA optimize")
+        finally:
+            connection.close()
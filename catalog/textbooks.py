@@ -0,0 +1,160 @@
+"""Textbook lists pulled out of the Textbook blocks.
+
+A block is either a numbered list::
+
+    Textbook: 1. Operating System Concepts, 7th / 8th Edition, by Abraham Silberschatz
+    2. Modern Operating Systems 4th Edition, by Andrew S. Tanenbaum
+
+or a single line such as ``As per instructor's guideline``. Each entry is
+split into a title, authors and an edition. The authors are whatever follows
+the last ``by``, and the edition is the first ``... Edition`` phrase.
+Entries without a ``by`` keep everything in the title.
+
+``TextbookTable`` interns the entries: each distinct book is stored once and
+gets an id, and each course keeps a tuple of ids in list order. Two entries
+are the same book when their lowercased words match, so punctuation and
+spacing differences do not count. Memory and output therefore grow with the
+number of distinct books, not with how often they are cited. The table is
+written as JSON::
+
+    {"textbooks": [{"id": 0, "title": "...", "authors": "...", "edition": "..."}, ...],
+     "courses": [{"courseCode": "CSE2305", "textbooks": [3, 4]}, ...]}
+"""
+
+import json
+import re
+
+from catalog.record import RecordObserver
+from catalog.search import tokenize_text
+
+# A list number: "1." or "1)" at the start or after whitespace
+_NUMBER = re.compile(r'(?<!\S)(\d{1,2})[.)]\s+')
+
+_ORDINALS = ('first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|tenth|'
+             'eleventh|twelfth|latest|international|revised')
+_EDITION_PHRASE = (rf'(?:\d+(?:st|nd|rd|th)(?:\s*/\s*\d+(?:st|nd|rd|th))?|{_ORDINALS})'
+                   r'\s+edition\b')
+# "5th Edition", or "(5th edition)" with its brackets
+_EDITION = re.compile(rf'\(\s*({_EDITION_PHRASE})\s*\)|\b({_EDITION_PHRASE})', re.IGNORECASE)
+
+# "by", or a doubled "by by"
+_BY = re.compile(r'(?:\s+by)+\s+', re.IGNORECASE)
+
+# A "by" left hanging at the end once the edition is cut out
+_DANGLING_BY = re.compile(r'[\s,;]+by$', re.IGNORECASE)
+
+# A trailing "(Schaum's outline series)" and the like
+_TRAILING_NOTE = re.compile(r'\s*(\([^()]*\))$')
+
+
+def split_entries(text):
+    """The entries of a Textbook block, in list order.
+
+    Numbers only split the text when they count up from 1, so a number
+    inside a title does not start a new entry. Text with no ``1.`` is a
+    single entry.
+    """
+    text = ' '.join(text.split())
+    cuts = []
+    expected = 1
+    for match in _NUMBER.finditer(text):
+        if int(match.group(1)) == expected:
+            cuts.append(match)
+            expected += 1
+    if not cuts:
+        return [text] if text else []
+    entries = []
+    for match, following in zip(cuts, cuts[1:] + [None]):
+        end = following.start() if following is not None else len(text)
+        entry = text[match.end():end].strip()
+        if entry:
+            entries.append(entry)
+    return entries
+
+
+def parse_entry(entry):
+    """``(title, authors, edition)`` of one textbook entry."""
+    text = entry.strip(' .,;')
+    edition = ''
+    match = _EDITION.search(text)
+    if match:
+        edition = match.group(1) or match.group(2)
+        before = text[:match.start()].rstrip(' ,;')
+        after = text[match.end():].lstrip(' ,;.')
+        if before and after and not after.lower().startswith('by '):
+            text = f"{before}, {after}"
+        else:
+            text = _DANGLING_BY.sub('', f"{before} {after}".strip())
+    authors = ''
+    splits = list(_BY.finditer(text))
+    if splits:
+        last = splits[-1]
+        title, authors = text[:last.start()], text[last.end():]
+        note = _TRAILING_NOTE.search(authors)
+        if note:
+            # A series note reads as part of the title, not as an author
+            authors = authors[:note.start()]
+            title = f"{title} {note.group(1)}"
+        text = title
+    return text.strip(' ,;'), authors.strip(' ,;.'), edition
+
+
+class TextbookTable(RecordObserver):
+    """Distinct textbooks and the ordered list each course cites."""
+
+    def __init__(self):
+        self.books = []
+        self.ids = {}
+        # Entry text as written -> id, so a repeated citation skips tokenizing
+        self.spellings = {}
+        self.courses = {}
+        self.lists = {}
+        self.mentions = 0
+
+    def intern(self, entry):
+        """Id of the book ``entry`` names, adding the book if it is new."""
+        book = self.spellings.get(entry)
+        if book is not None:
+            return book
+        key = ' '.join(tokenize_text(entry))
+        book = self.ids.get(key)
+        if book is None:
+            book = self.ids[key] = len(self.books)
+            self.books.append(parse_entry(entry))
+        self.spellings[entry] = book
+        return book
+
+    def link(self, code, text):
+        """Record the Textbook block ``text`` as ``code``'s list."""
+        ids = tuple(self.intern(entry) for entry in split_entries(text))
+        self.mentions += len(ids)
+        if ids:
+            # Many courses cite the same list; keep one tuple for all of them
+            self.courses[code] = self.lists.setdefault(ids, ids)
+        else:
+            self.courses.pop(code, None)
+
+    def add(self, record):
+        code = record.course_code.strip()
+        if code:
+            self.link(code, record.textbook)
+
+    def rows(self):
+        """``(id, title, authors, edition)`` for every distinct book."""
+        return [(book, *fields) for book, fields in enumerate(self.books)]
+
+    def links(self):
+        """``(code, position, id)`` for every course's list, positions from 1."""
+        return [(code, position, book)
+                for code, books in self.courses.items()
+                for position, book in enumerate(books, 1)]
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump({
+                'textbooks': [{'id': book, 'title': title, 'authors': authors,
+                               'edition': edition}
+                              for book, title, authors, edition in self.rows()],
+                'courses': [{'courseCode': code, 'textbooks': list(books)}
+                            for code, books in self.courses.items()],
+            }, handle, ensure_ascii=False, separators=(',', ':'))
@@ -0,0 +1,127 @@
+"""Trigram typeahead index for the course picker.
+
+``CourseCombobox`` keeps a course when the lowercased query is a substring
+of its lowercased ``courseCode`` or ``courseTitle``, and it checks every
+course on every keystroke. This index precomputes those lowercased keys and
+maps each trigram to the courses containing it. A query of three or more
+characters then only looks at the courses that share all of its trigrams,
+and a substring check on those few gives exactly the component's matches,
+in the same order. Shorter queries fall back to the linear scan, which is
+cheap at that length and is exact.
+
+data2csv.py writes the index with ``--typeahead PATH`` as a static JSON
+asset::
+
+    {"version": 1,
+     "courses": [["CSE1101", "Introduction to Computing"], ...],
+     "trigrams": {"cse": [0, 1, 1, ...], ...}}
+
+Each trigram's course positions are delta-encoded (the first is absolute,
+and each one after is the gap from the previous). Trigrams are taken from
+the code and the title separately, so none spans the two.
+"""
+
+import json
+
+from catalog.record import RecordObserver
+
+VERSION = 1
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def linear_filter(courses, query):
+    """The component's current filter over ``(code, title)`` pairs."""
+    needle = query.lower()
+    return [course for course in courses
+            if not needle or needle in course[0].lower() or needle in course[1].lower()]
+
+
+class TypeaheadIndex:
+    """``(code, title)`` pairs with their lowercased keys and trigram postings."""
+
+    def __init__(self, courses, postings=None):
+        self.courses = [tuple(course) for course in courses]
+        self.keys = [(code.lower(), title.lower()) for code, title in self.courses]
+        if postings is None:
+            postings = {}
+            for position, (code, title) in enumerate(self.keys):
+                for gram in trigrams(code) | trigrams(title):
+                    postings.setdefault(gram, []).append(position)
+        self.postings = {gram: frozenset(ids) for gram, ids in postings.items()}
+
+    def search(self, query, limit=None):
+        """Courses matching ``query`` exactly as the component would, in order."""
+        needle = query.lower()
+        if len(needle) < 3:
+            matches = [position for position, (code, title) in enumerate(self.keys)
+                       if needle in code or needle in title]
+        else:
+            sets = []
+            for gram in trigrams(needle):
+                ids = self.postings.get(gram)
+                if ids is None:
+                    return []
+                sets.append(ids)
+            sets.sort(key=len)
+            candidates = sets[0].intersection(*sets[1:])
+            if len(needle) == 3:
+                # The trigram is the whole query, so every candidate matches
+                matches = sorted(candidates)
+            else:
+                keys = self.keys
+                matches = sorted(position for position in candidates
+                                 if needle in keys[position][0] or needle in keys[position][1])
+        if limit is not None:
+            matches = matches[:limit]
+        return [self.courses[position] for position in matches]
+
+    def to_dict(self):
+        trigram_lists = {}
+        for gram in sorted(self.postings):
+            previous = 0
+            gaps = []
+            for position in sorted(self.postings[gram]):
+                gaps.append(position - previous)
+                previous = position
+            trigram_lists[gram] = gaps
+        return {'version': VERSION, 'courses': [list(course) for course in self.courses],
+                'trigrams': trigram_lists}
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.to_dict(), handle, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as handle:
+            data = json.load(handle)
+        if data.get('version') != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} typeahead index")
+        postings = {}
+        for gram, gaps in data['trigrams'].items():
+            position = 0
+            ids = []
+            for gap in gaps:
+                position += gap
+                ids.append(position)
+            postings[gram] = ids
+        return cls(data['courses'], postings)
+
+
+class TypeaheadBuilder(RecordObserver):
+    """Collects ``(code, title)`` pairs from a record stream."""
+
+    def __init__(self):
+        self.titles = {}
+
+    def add(self, record):
+        code = record.course_code.strip()
+        if code:
+            self.titles[code] = record.course_title.strip()
+
+    def build(self):
+        # Sorted by code, as /api/admin/courses returns them to the component
+        return TypeaheadIndex(sorted(self.titles.items()))
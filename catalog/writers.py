@@ -0,0 +1,162 @@
+"""Output writers for parsed course records.
+
+A sink takes records in one or more ``write()`` calls and returns how many
+it wrote each time, which lets batch ingestion feed it file by file.
+"""
+
+import csv
+import json
+import os
+import re
+import sys
+
+from catalog.record import HEADERS
+
+# The leading number JavaScript's parseFloat() would read
+_LEADING_NUMBER = re.compile(r'\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+
+
+def write_rows(writer, records):
+    """Write ``records`` through a ``csv.writer`` and return the rows written."""
+    count = 0
+    for course in records:
+        # Only write row if it has a Course Code
+        if course.course_code:
+            writer.writerow(course.as_row())
+            count += 1
+    return count
+
+
+def write_csv(records, csvfile):
+    """Stream ``records`` into ``csvfile`` and return the number of rows written."""
+    return CsvSink(csvfile).write(records)
+
+
+class CsvSink:
+    """courses.csv rows written to an already open text file."""
+
+    def __init__(self, csvfile):
+        self.writer = csv.writer(csvfile)
+        self.writer.writerow(HEADERS)
+
+    def write(self, records):
+        return write_rows(self.writer, records)
+
+    def close(self):
+        pass
+
+
+def credit_hour_value(text):
+    """``parseFloat(text) || 0``, as the admin dashboard maps Credit Hour."""
+    match = _LEADING_NUMBER.match(text)
+    value = float(match.group(1)) if match else 0.0
+    if value != value:
+        return 0
+    return int(value) if value.is_integer() else value
+
+
+def course_import(record):
+    """The record as a ``CourseImport`` object for /api/admin/courses/import.
+
+    Mirrors the mapping the dashboard applies to spreadsheet rows.
+    """
+    return {
+        'courseCode': record.course_code.strip(),
+        'courseTitle': record.course_title.strip(),
+        'creditHour': credit_hour_value(record.credit_hour),
+        'prerequisite': record.prerequisite.strip() or 'N/A',
+        'content': record.content.strip(),
+    }
+
+
+class ImportSink:
+    """``CourseImport`` objects as JSON request bodies or NDJSON lines.
+
+    ``json`` output is ``{"courses": [...], "mode": ...}``, ready to POST.
+    With ``max_records`` or ``max_bytes`` the output is split into numbered
+    files next to ``path`` (``courses-0001.json``, ...), each within the
+    budget; a single object larger than ``max_bytes`` gets a file to itself.
+    """
+
+    def __init__(self, path, fmt='json', mode='update', max_records=None, max_bytes=None):
+        if fmt not in ('json', 'ndjson'):
+            raise ValueError(f"unknown import format {fmt!r}")
+        self.path = path
+        self.fmt = fmt
+        self.chunked = bool(max_records or max_bytes)
+        if self.chunked and path == '-':
+            raise ValueError("chunked output needs a file path, not stdout")
+        if (max_records is not None and max_records < 1) or (max_bytes is not None
+                                                             and max_bytes < 1):
+            raise ValueError("chunk limits must be at least 1")
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        if fmt == 'json':
+            self._head = ('{"mode":%s,"courses":[' % json.dumps(mode)).encode('utf-8')
+            self._separator, self._tail = b',', b']}\n'
+        else:
+            self._head, self._separator, self._tail = b'', b'', b''
+        self.paths = []
+        self._handle = None
+        self._records = 0
+        self._bytes = 0
+        if not self.chunked:
+            self._open(path)
+
+    def _open(self, path):
+        if path == '-':
+            self._handle = sys.stdout.buffer
+        else:
+            self._handle = open(path, 'wb')
+        self.paths.append(path)
+        self._handle.write(self._head)
+        self._records = 0
+        self._bytes = len(self._head) + len(self._tail)
+
+    def _finish(self):
+        if self._handle is None:
+            return
+        self._handle.write(self._tail)
+        if self.path == '-':
+            self._handle.flush()
+        else:
+            self._handle.close()
+        self._handle = None
+
+    def _chunk_path(self):
+        stem, ext = os.path.splitext(self.path)
+        return f"{stem}-{len(self.paths) + 1:04d}{ext}"
+
+    def _full(self, size):
+        if self._records == 0:
+            return False
+        if self.max_records and self._records >= self.max_records:
+            return True
+        return bool(self.max_bytes) and self._bytes + size > self.max_bytes
+
+    def write(self, records):
+        count = 0
+        separator = self._separator
+        for record in records:
+            if not record.course_code:
+                continue
+            body = json.dumps(course_import(record), ensure_ascii=False,
+                              separators=(',', ':')).encode('utf-8')
+            if self.fmt == 'ndjson':
+                body += b'\n'
+
+            if self.chunked and (self._handle is None
+                                 or self._full(len(separator) + len(body))):
+                self._finish()
+                self._open(self._chunk_path())
+            if self._records:
+                self._handle.write(separator)
+                self._bytes += len(separator)
+            self._handle.write(body)
+            self._records += 1
+            self._bytes += len(body)
+            count += 1
+        return count
+
+    def close(self):
+        self._finish()
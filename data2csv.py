@@ -1,5 +1,28 @@
-import csv
-import re
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+
+from catalog import diff, iter_lines, parse_tokens, tokenize
+from catalog.batch import expand_batch, ingest
+from catalog.cache import ParseCache, scan_cached
+from catalog.columnar import columnar_sink, have_pyarrow
+from catalog.dedup import DuplicateFinder
+from catalog.delta import DeltaFilter, load_digests
+from catalog.extsort import DUPLICATE_POLICIES, RecordSorter, check_budget
+from catalog.graph import PrereqIndexBuilder
+from catalog.instrument import Profiler
+from catalog.mongo import MongoSink, connect
+from catalog.parallel import parse_parallel
+from catalog.scanner import scan_buffer, scan_records
+from catalog.search import SearchIndexBuilder
+from catalog.sqlite import SqliteSink
+from catalog.textbooks import TextbookTable
+from catalog.typeahead import TypeaheadBuilder
+from catalog.writers import CsvSink, ImportSink
 
 # 1. PASTE THE RAW DATA HERE
 # (I have included the data you provided in the variable below)
@@ -1166,84 +1189,452 @@ Textbook: As per instructor 's guideline
  
 """
 
-# 2. PARSING LOGIC
-courses = []
-current_course = {}
-lines = raw_data.split('\n')
-reading_content = False
-
-for line in lines:
-    clean_line = line.strip()
-    
-    # Skip empty lines unless we are currently reading a multi-line content block
-    if not clean_line:
-        if reading_content:
-            # We assume a blank line in the text ends the content block for safety, 
-            # or you can simply continue. Here we continue but don't add text.
-            continue
+# 2. PARSING AND OUTPUT
+def open_input(paths):
+    """Lines from the given catalog files (or stdin), else from raw_data."""
+    if paths:
+        return iter_lines(paths)
+    return io.StringIO(raw_data)
+
+
+def read_records(args, cache=None, profiler=None, textbooks=False):
+    """Parsed records for the command line, via mmap scanning if requested.
+
+    With a ``profiler``, the line-based pipeline is timed as separate read,
+    classify and assemble stages; the other sources are timed as one parse
+    stage. Textbook text is only kept when ``textbooks`` is set.
+    """
+    if cache is not None and args.inputs:
+        records = scan_cached(args.inputs, cache, args.code_prefix, textbooks, args.workers)
+    elif args.workers > 1 and args.inputs:
+        records = parse_parallel(args.inputs, args.workers, args.code_prefix,
+                                 textbooks=textbooks)
+    elif args.mmap and args.inputs:
+        records = scan_records(args.inputs, args.code_prefix, textbooks)
+    elif args.mmap:
+        records = scan_buffer(raw_data.encode('utf-8'), args.code_prefix, textbooks)
+    else:
+        return _parse_lines(args, profiler, textbooks)
+    return profiler.timed('parse', records) if profiler is not None else records
+
+
+def _parse_lines(args, profiler, textbooks):
+    lines = open_input(args.inputs)
+    if profiler is None:
+        records = parse_tokens(tokenize(lines), textbooks)
+    else:
+        tokens = profiler.tokens(tokenize(profiler.lines(lines)))
+        records = profiler.timed('assemble', parse_tokens(tokens, textbooks))
+    if args.code_prefix:
+        records = (r for r in records if r.course_code.startswith(args.code_prefix))
+    return records
+
+
+@contextlib.contextmanager
+def open_sink(args):
+    """The output sink for ``args.format``, closed when the block ends."""
+    if args.format == 'csv':
+        if args.output == '-':
+            yield CsvSink(sys.stdout)
         else:
-            continue
-
-    if clean_line.startswith("Course Code:"):
-        # Save previous course if exists
-        if current_course:
-            courses.append(current_course)
-        
-        # Start new course
-        current_course = {
-            'Course Code': clean_line.replace("Course Code:", "").strip(),
-            'Course Title': '',
-            'Credit Hour': '',
-            'Prerequisite': '',
-            'Content': ''
-        }
-        reading_content = False
-
-    elif clean_line.startswith("Course Title:"):
-        current_course['Course Title'] = clean_line.replace("Course Title:", "").strip()
-        reading_content = False
-
-    elif clean_line.startswith("Credit Hour:"):
-        current_course['Credit Hour'] = clean_line.replace("Credit Hour:", "").strip()
-        reading_content = False
-
-    elif clean_line.startswith("Prerequisite:"):
-        current_course['Prerequisite'] = clean_line.replace("Prerequisite:", "").strip()
-        reading_content = False
-
-    # Note: Text uses both "Content:" and "Contents:"
-    elif clean_line.startswith("Content:") or clean_line.startswith("Contents:"):
-        # Remove the label and whitespace
-        content_text = re.sub(r"Contents?:", "", clean_line).strip()
-        current_course['Content'] = content_text
-        reading_content = True
-
-    elif clean_line.startswith("Textbook:"):
-        reading_content = False
-    
-    elif reading_content:
-        # If we are in reading mode and it's not a new key, append to content
-        current_course['Content'] += " " + clean_line
-
-# Append the last course processed
-if current_course:
-    courses.append(current_course)
-
-# 3. WRITE TO CSV
-output_filename = 'courses.csv'
-headers = ['Course Code', 'Course Title', 'Credit Hour', 'Prerequisite', 'Content']
-
-try:
-    with open(output_filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=headers)
-        writer.writeheader()
-        
-        for course in courses:
-            # Only write row if it has a Course Code
-            if course.get('Course Code'):
-                writer.writerow(course)
-
-    print(f"Successfully converted {len(courses)} courses to '{output_filename}'.")
-
-except IOError:
-    print("Error writing to file.")
\ No newline at end of file
+            # Written beside the output and renamed over it only once the
+            # input has been read, so a failed run leaves the old file alone
+            partial = args.output + '.part'
+            try:
+                with open(partial, 'w', newline='', encoding='utf-8') as csvfile:
+                    yield CsvSink(csvfile)
+            except BaseException:
+                os.remove(partial)
+                raise
+            os.replace(partial, args.output)
+        return
+
+    if args.format in ('columnar', 'sqlite'):
+        if args.format == 'sqlite':
+            sink = SqliteSink(args.output)
+        else:
+            sink = columnar_sink(args.output, args.columnar_engine)
+        try:
+            yield sink
+        finally:
+            sink.close()
+        return
+
+    if args.format == 'mongo':
+        sink = MongoSink(connect(args.mongo_uri, args.mongo_db),
+                         args.mongo_batch_size, args.mongo_parallel)
+        try:
+            yield sink
+        finally:
+            result = sink.close()
+        write_import_result(result, args.output)
+        return
+
+    sink = ImportSink(args.output, args.format, args.import_mode,
+                      args.chunk_records, args.chunk_bytes)
+    try:
+        yield sink
+    finally:
+        sink.close()
+
+
+def write_import_result(result, path):
+    """Save the loader's ``ImportResult`` as JSON ('-' prints it)."""
+    if path == '-':
+        json.dump({'result': result}, sys.stdout, indent=2)
+        print()
+        return
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump({'result': result}, handle, indent=2)
+
+
+def make_select(delta, observers):
+    """Per-stream step between parsing and the sink, or None if there is none.
+
+    ``observers`` (index builders and the like) see every parsed record;
+    the delta filter then drops unchanged ones before they are written.
+    """
+    if delta is None and not observers:
+        return None
+
+    def select(records):
+        for observer in observers:
+            records = observer.observe(records)
+        if delta is not None:
+            records = delta.filter(records)
+        return records
+    return select
+
+
+def convert(args, sink, cache=None, delta=None, profiler=None, observers=(),
+            textbooks=False):
+    """Write the output for ``args``; return the row count and per-file stats."""
+    select = make_select(delta, observers)
+    if args.batch:
+        return asyncio.run(ingest(expand_batch(args.batch), sink, args.concurrency,
+                                  code_prefix=args.code_prefix, cache=cache,
+                                  select=select, textbooks=textbooks))
+    records = read_records(args, cache, profiler, textbooks)
+    if select is not None:
+        records = select(records)
+    if profiler is None:
+        return sink.write(records), []
+    with profiler.section('write') as stats:
+        stats[1] = sink.write(records)
+    return stats[1], []
+
+
+def report_delta(delta, removed_path, status):
+    """Print the delta summary and write or list the removed course codes."""
+    removed = delta.removed()
+    print(f"Delta: {delta.added} added, {delta.changed} changed, "
+          f"{delta.unchanged} unchanged, {len(removed)} removed.", file=status)
+    if removed_path:
+        with open(removed_path, 'w', encoding='utf-8') as handle:
+            handle.writelines(code + '\n' for code in removed)
+    elif removed:
+        print("Removed: " + ", ".join(removed), file=status)
+
+
+def report_prereqs(index, status):
+    """Print the prerequisite index summary, including cycles and dangling codes."""
+    print(f"Prerequisite index: {len(index.codes)} courses, max depth "
+          f"{max(index.depth_of, default=0)}, {len(index.cycles)} cycles, "
+          f"{len(index.dangling)} courses with unknown prerequisites, "
+          f"{len(index.alternatives)} with either-or prerequisites.", file=status)
+    for cycle in index.cycles:
+        print("  cycle: " + " -> ".join(cycle), file=status)
+    for code, missing in index.dangling.items():
+        print(f"  {code}: unknown {', '.join(missing)}", file=status)
+
+
+def positive_int(text):
+    """argparse type for counts that must be at least 1."""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, not {text}")
+    return value
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Convert pasted course catalog text into courses.csv. "
+                    "'data2csv.py diff OLD NEW' compares two catalogs instead.")
+    parser.add_argument(
+        'inputs', nargs='*',
+        help="Catalog text files to merge in order ('-' reads stdin). "
+             "Defaults to the raw_data block in this script.")
+    parser.add_argument(
+        '-o', '--output',
+        help="Output path ('-' writes to stdout). Default: courses.csv, or "
+             "courses.json / courses.ndjson for those formats")
+    parser.add_argument(
+        '--format', choices=['csv', 'json', 'ndjson', 'mongo', 'columnar', 'sqlite'],
+        default='csv',
+        help="csv for the dashboard upload, CourseImport objects for "
+             "/api/admin/courses/import as a JSON request body or NDJSON, "
+             "mongo to upsert straight into the admincourses collection "
+             "(-o then receives the ImportResult JSON; default stdout), or "
+             "columnar for dictionary-encoded columns (Parquet with pyarrow), "
+             "or sqlite for an indexed database with FTS5 search. Default: csv")
+    parser.add_argument(
+        '--columnar-engine', choices=['auto', 'parquet', 'stdlib'], default='auto',
+        help="Writer for --format columnar: Parquet via pyarrow, or the "
+             "built-in layout read by catalog.columnar. Default: Parquet if "
+             "pyarrow is installed")
+    parser.add_argument(
+        '--import-mode', choices=['update', 'replace'], default='update',
+        help="The 'mode' field of --format json request bodies. Default: update")
+    parser.add_argument(
+        '--chunk-records', type=positive_int, metavar='N',
+        help="Split json/ndjson output into numbered files of at most N courses")
+    parser.add_argument(
+        '--chunk-bytes', type=positive_int, metavar='BYTES',
+        help="Split json/ndjson output into numbered files of at most BYTES")
+    parser.add_argument(
+        '--mongo-uri', default=os.environ.get('MONGODB_URI'),
+        help="MongoDB connection string for --format mongo. "
+             "Default: $MONGODB_URI, as used by the app")
+    parser.add_argument(
+        '--mongo-db',
+        help="Database name, if the URI does not include one")
+    parser.add_argument(
+        '--mongo-batch-size', type=positive_int, default=1000, metavar='N',
+        help="Upserts per bulk_write call. Default: 1000")
+    parser.add_argument(
+        '--mongo-parallel', type=positive_int, default=4, metavar='N',
+        help="bulk_write batches in flight at once. Default: 4")
+    parser.add_argument(
+        '--mmap', action='store_true',
+        help="Memory-map each input file and scan it for record boundaries "
+             "instead of reading it line by line")
+    parser.add_argument(
+        '--code-prefix', default='', metavar='PREFIX',
+        help="Only keep courses whose code starts with PREFIX (e.g. CSE)")
+    parser.add_argument(
+        '--workers', type=positive_int, default=1, metavar='N',
+        help="Parse input files in N processes (implies --mmap scanning). "
+             "Default: 1")
+    parser.add_argument(
+        '--batch', metavar='DIR_OR_GLOB',
+        help="Read every *.txt file in a directory (or files matching a glob) "
+             "concurrently instead of the positional inputs")
+    parser.add_argument(
+        '--concurrency', type=positive_int, default=8, metavar='N',
+        help="Files read and parsed at once in --batch mode. Default: 8")
+    parser.add_argument(
+        '--cache-dir', metavar='DIR',
+        help="Reuse parsed records for input files whose contents have not "
+             "changed, keyed by a hash of each file")
+    parser.add_argument(
+        '--cache-max-mb', type=float, default=256, metavar='MB',
+        help="Evict least recently used cache entries beyond this size. Default: 256")
+    parser.add_argument(
+        '--cache-max-age', type=float, default=180, metavar='DAYS',
+        help="Evict cache entries unused for this many days. Default: 180")
+    parser.add_argument(
+        '--since', metavar='PREVIOUS_CSV',
+        help="Only write courses that are new or changed relative to an earlier "
+             "courses.csv")
+    parser.add_argument(
+        '--removed', metavar='PATH',
+        help="With --since, write course codes missing from this run to PATH, "
+             "one per line (default: list them in the summary)")
+    parser.add_argument(
+        '--sort-by', metavar='COLUMNS',
+        help="Write courses ordered by these comma-separated fields "
+             "(course_code, course_title, credit_hour, prerequisite, content), "
+             "spilling sorted runs to temporary files beyond --sort-memory-mb. "
+             "Repeated codes are reduced to one row")
+    parser.add_argument(
+        '--on-duplicate', choices=DUPLICATE_POLICIES, default='keep-last',
+        help="With --sort-by, which row a repeated course code keeps: the first, "
+             "the last, or a merge where later non-empty fields win. "
+             "Default: keep-last, as the admin import would")
+    parser.add_argument(
+        '--sort-memory-mb', type=float, default=256, metavar='MB',
+        help="Memory for rows buffered by --sort-by, at least 1. Default: 256")
+    parser.add_argument(
+        '--prereq-index', metavar='PATH',
+        help="Also build the prerequisite graph index (closures, topological "
+             "order, cycles, dangling codes) and save it to PATH as JSON")
+    parser.add_argument(
+        '--search-index', metavar='PATH',
+        help="Also build a BM25 full-text index over course titles and Content "
+             "and save it to PATH (query it with catalog.search.SearchIndex)")
+    parser.add_argument(
+        '--typeahead', metavar='PATH',
+        help="Also write a trigram typeahead index of course codes and titles "
+             "to PATH as a static JSON asset")
+    parser.add_argument(
+        '--duplicates', metavar='PATH',
+        help="Also find near-duplicate courses by their Content (MinHash/LSH) "
+             "and write the clusters to PATH as JSON")
+    parser.add_argument(
+        '--duplicate-threshold', type=float, default=0.5, metavar='JACCARD',
+        help="Shingle overlap at which two courses count as duplicates. "
+             "Default: 0.5")
+    parser.add_argument(
+        '--textbooks', metavar='PATH',
+        help="Also write each course's numbered Textbook list to PATH as JSON, "
+             "with every distinct book stored once and referenced by id")
+    parser.add_argument(
+        '--profile', metavar='PATH',
+        help="Write per-stage timings, field hit counts and bytes read to PATH "
+             "as JSON")
+    parser.add_argument(
+        '--profile-capture', choices=['cprofile', 'tracemalloc'],
+        help="With --profile, also record a cProfile summary or the top "
+             "tracemalloc allocation sites")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['diff']:
+        # data2csv.py diff OLD NEW: a changelog instead of a conversion
+        return diff.main(argv[1:])
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.format == 'columnar' and args.columnar_engine == 'auto':
+        args.columnar_engine = 'parquet' if have_pyarrow() else 'stdlib'
+    if args.output is None:
+        if args.format == 'mongo':
+            args.output = '-'
+        elif args.format == 'columnar':
+            args.output = ('courses.parquet' if args.columnar_engine == 'parquet'
+                           else 'courses.cols')
+        elif args.format == 'sqlite':
+            args.output = 'courses.db'
+        else:
+            args.output = f"courses.{args.format}"
+    if args.format in ('columnar', 'sqlite') and args.output == '-':
+        parser.error(f"--format {args.format} needs an output file")
+    if args.format == 'mongo' and not args.mongo_uri:
+        parser.error("--format mongo needs --mongo-uri or MONGODB_URI")
+    chunked = args.chunk_records or args.chunk_bytes
+    if chunked and (args.format not in ('json', 'ndjson') or args.output == '-'):
+        parser.error("--chunk-records/--chunk-bytes need --format json or ndjson "
+                     "and an output file")
+    # Textbook text is parsed only for the consumers that read it
+    keep_textbooks = bool(args.textbooks) or args.format == 'sqlite'
+    sorter = None
+    if args.sort_by:
+        try:
+            check_budget(int(args.sort_memory_mb * 2**20))
+        except ValueError as exc:
+            parser.error(f"--sort-memory-mb: {exc}")
+        try:
+            sorter = RecordSorter([field.strip() for field in args.sort_by.split(',')],
+                                  args.on_duplicate, int(args.sort_memory_mb * 2**20),
+                                  keep_textbooks)
+        except ValueError as exc:
+            parser.error(f"--sort-by: {exc}")
+    for path in args.inputs:
+        if path != '-':
+            try:
+                open(path, 'rb').close()
+            except OSError as exc:
+                parser.error(f"cannot read input file: {exc}")
+    if args.batch and not expand_batch(args.batch):
+        parser.error(f"no catalog files match '{args.batch}'")
+    delta = None
+    if args.since:
+        if os.path.abspath(args.since) == os.path.abspath(args.output):
+            parser.error("--since must not be the output file; it would be "
+                         "overwritten by the delta")
+        try:
+            with open(args.since, newline='', encoding='utf-8') as previous:
+                delta = DeltaFilter(load_digests(previous, args.code_prefix))
+        except (OSError, ValueError) as exc:
+            parser.error(f"cannot read --since file: {exc}")
+    cache = None
+    if args.cache_dir:
+        cache = ParseCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024),
+                           args.cache_max_age * 86400)
+
+    profiler = Profiler(args.profile_capture) if args.profile else None
+    prereqs = PrereqIndexBuilder() if args.prereq_index else None
+    search = SearchIndexBuilder() if args.search_index else None
+    typeahead = TypeaheadBuilder() if args.typeahead else None
+    duplicates = DuplicateFinder(args.duplicate_threshold) if args.duplicates else None
+    textbooks = TextbookTable() if args.textbooks else None
+    observers = [observer for observer in
+                 (prereqs, search, typeahead, duplicates, textbooks)
+                 if observer is not None]
+
+    # 3. WRITE TO CSV
+    try:
+        with profiler.capturing() if profiler is not None else contextlib.nullcontext():
+            with open_sink(args) as sink:
+                if sorter is None:
+                    count, file_stats = convert(args, sink, cache, delta, profiler,
+                                                observers, keep_textbooks)
+                else:
+                    # Everything is buffered first, then written in order
+                    count, file_stats = convert(args, sorter, cache, delta, profiler,
+                                                observers, keep_textbooks)
+                    count = sorter.write_to(sink)
+    except ImportError as exc:
+        parser.error(str(exc))
+    except ValueError as exc:
+        print(f"Error reading input: {exc}", file=sys.stderr)
+        return 1
+    except IOError:
+        print("Error writing to file.", file=sys.stderr)
+        return 1
+
+    # Keep stdout clean when the CSV itself is going there
+    status = sys.stderr if args.output == '-' else sys.stdout
+    for stats in file_stats:
+        print(f"  {stats.path}: {stats.records} courses in {stats.seconds:.3f}s", file=status)
+    if delta is not None:
+        report_delta(delta, args.removed, status)
+    if sorter is not None:
+        spilled = f", {sorter.runs} runs spilled" if sorter.runs else ""
+        print(f"Sorted by {', '.join(sorter.columns)}{spilled}; {sorter.dropped} "
+              f"duplicate rows resolved ({args.on_duplicate}).", file=status)
+    if cache is not None:
+        evicted = cache.prune()
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses, {evicted} evicted.",
+              file=status)
+    if profiler is not None:
+        profiler.write(args.profile, records_written=count,
+                       files=[stats._asdict() for stats in file_stats])
+    if prereqs is not None:
+        index = prereqs.build()
+        index.save(args.prereq_index)
+        report_prereqs(index, status)
+    if search is not None:
+        documents, terms = search.save(args.search_index)
+        print(f"Search index: {documents} courses, {terms} terms.", file=status)
+    if typeahead is not None:
+        index = typeahead.build()
+        index.save(args.typeahead)
+        print(f"Typeahead index: {len(index.courses)} courses, "
+              f"{len(index.postings)} trigrams.", file=status)
+    if duplicates is not None:
+        clusters = duplicates.save(args.duplicates)
+        print(f"Duplicates: {len(clusters)} clusters covering "
+              f"{sum(len(cluster['courses']) for cluster in clusters)} courses "
+              f"({duplicates.candidates} candidate pairs checked).", file=status)
+    if textbooks is not None:
+        textbooks.save(args.textbooks)
+        print(f"Textbooks: {len(textbooks.books)} distinct books from "
+              f"{textbooks.mentions} list entries.", file=status)
+    if isinstance(sink, SqliteSink) and not sink.fts:
+        print("SQLite: this build has no FTS5; courses_fts was not created.", file=status)
+    if isinstance(sink, MongoSink):
+        print(f"MongoDB: {sink.result['created']} created, {sink.result['updated']} "
+              f"updated, {len(sink.result['errors'])} errors.", file=status)
+    if getattr(sink, 'chunked', False):
+        print(f"Wrote {len(sink.paths)} chunk files.", file=status)
+        target = sink.paths[0] if sink.paths else args.output
+    else:
+        target = args.output
+    print(f"Successfully converted {count} courses to '{target}'.", file=status)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""Tests for the word-level Content diff in catalog.diff."""
+
+from catalog.diff import format_word_diff, word_diff
+
+WORDS = 'a b c d e f g h i j k l m n o p q r s t'
+
+
+def diff(new):
+    return format_word_diff(word_diff(WORDS, new))
+
+
+def test_middle_change_keeps_the_words_around_it():
+    assert diff('a b c d e f g h i J k l m n o p q r s t') == 'f g h i [-j-] {+J+} k l m n'
+
+
+def test_first_word_change_keeps_the_words_after_it():
+    assert diff('A b c d e f g h i j k l m n o p q r s t') == '[-a-] {+A+} b c d e'
+
+
+def test_last_word_change_keeps_the_words_before_it():
+    assert diff('a b c d e f g h i j k l m n o p q r s T') == 'p q r s [-t-] {+T+}'
+
+
+def test_span_between_changes_keeps_both_ends():
+    assert (diff('a B c d e f g h i j k l m n o p q R s t')
+            == 'a [-b-] {+B+} c d e f ... n o p q [-r-] {+R+} s t')
+
+
+def test_short_spans_are_kept_whole():
+    assert format_word_diff(word_diff('a b c', 'a X c')) == 'a [-b-] {+X+} c'
@@ -0,0 +1,24 @@
+"""Tests for reading catalog files in catalog.parser and catalog.scanner."""
+
+import pytest
+
+from catalog.parser import iter_lines, parse_records
+from catalog.scanner import scan_file
+
+CATALOG = 'Course Code: CSE1101\nCourse Title: Structured Programming\nCredit Hour: 3\n'
+
+
+def test_byte_order_mark_keeps_the_first_course(tmp_path):
+    path = tmp_path / 'bom.txt'
+    path.write_bytes(b'\xef\xbb\xbf' + CATALOG.encode('utf-8'))
+    for records in (parse_records(iter_lines([str(path)])), scan_file(str(path))):
+        assert [record.course_code for record in records] == ['CSE1101']
+
+
+def test_non_utf8_file_names_the_file(tmp_path):
+    path = tmp_path / 'latin1.txt'
+    path.write_bytes(CATALOG.replace('Structured', 'Caf\xe9').encode('latin-1'))
+    for read in (lambda: list(parse_records(iter_lines([str(path)]))),
+                 lambda: list(scan_file(str(path)))):
+        with pytest.raises(ValueError, match='latin1.txt is not UTF-8'):
+            read()
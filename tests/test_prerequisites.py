@@ -0,0 +1,51 @@
+"""Tests for either-or prerequisites across catalog.graph, eligibility and planner."""
+
+from catalog.eligibility import EligibilityEngine
+from catalog.graph import PrereqIndexBuilder, parse_prerequisites
+from catalog.planner import SemesterPlanner
+from catalog.record import CourseRecord
+
+CATALOG = [
+    ('CSE1000', 'N/A'),
+    ('CSE1101', 'N/A'),
+    ('CSE1102', 'N/A'),
+    ('CSE1103', 'CSE1000'),
+    ('CSE2201', 'CSE1101 or CSE1102'),
+    ('CSE2202', 'CSE1103/CSE1102, CSE1000'),
+]
+
+
+def build_index():
+    builder = PrereqIndexBuilder()
+    for code, prerequisite in CATALOG:
+        builder.add(CourseRecord(code, code, '3', prerequisite, ''))
+    return builder.build()
+
+
+def test_alternatives_become_one_group():
+    assert parse_prerequisites('CSE1101 or 1102, MAT1101') == (
+        ['MAT1101'], [], [['CSE1101', 'CSE1102']])
+    assert parse_prerequisites('CSE1101 and/or CSE1102') == ([], [], [['CSE1101', 'CSE1102']])
+    assert parse_prerequisites('CSE1101 or consent') == ([], ['CSE1101 or consent'], [])
+
+
+def test_one_alternative_makes_a_student_eligible():
+    engine = EligibilityEngine(build_index())
+    none, one, other = engine.evaluate([[], ['CSE1102'], ['CSE1101']])
+    assert 'CSE2201' not in none
+    assert 'CSE2201' in one and 'CSE2201' in other
+
+
+def test_plan_takes_one_alternative_before_the_course():
+    planner = SemesterPlanner(build_index(), [3] * len(CATALOG))
+    plan = planner.plan(['CSE2201'], cap=3)
+    assert len(plan['semesters']) == 2
+    first, second = plan['semesters']
+    assert first in (['CSE1101'], ['CSE1102']) and second == ['CSE2201']
+
+
+def test_plan_prefers_an_alternative_already_in_the_plan():
+    planner = SemesterPlanner(build_index(), [3] * len(CATALOG))
+    plan = planner.plan(['CSE2202', 'CSE1103'], cap=3)
+    assert 'CSE1102' not in sum(plan['semesters'], [])
+    assert plan['semesters'][-1] == ['CSE2202']